@@ -15,6 +15,7 @@ export default function PublicSharePage() {
     const [error, setError] = useState('');
     const [passwordRequired, setPasswordRequired] = useState(false);
     const [password, setPassword] = useState('');
+    const [accessToken, setAccessToken] = useState('');
     const [passwordLoading, setPasswordLoading] = useState(false);
 
     useEffect(() => {
@@ -26,11 +27,19 @@ export default function PublicSharePage() {
         setError('');
 
         try {
-            const data = await apiClient.getPublicShare(shareId, pwd || password);
+            // Exchange the password once for a short-lived access token
+            let token = accessToken;
+            if (pwd) {
+                const unlocked = await apiClient.unlockShare(shareId, pwd);
+                token = unlocked.access_token;
+                setAccessToken(token);
+            }
+            const data = await apiClient.getPublicShare(shareId, token);
             setDocument(data);
             setPasswordRequired(false);
         } catch (err: any) {
-            if (err.message.includes('Password required')) {
+            if (err.message.includes('Password required') || err.message.includes('enter the password again')) {
+                setAccessToken('');
                 setPasswordRequired(true);
             } else {
                 setError(err.message || 'Share not found or has expired');
@@ -53,9 +62,9 @@ export default function PublicSharePage() {
         try {
             // Build download URL
             const params = new URLSearchParams();
-            if (password) params.append('password', password);
+            if (accessToken) params.append('token', accessToken);
 
-            const downloadUrl = `http://localhost:8000/api/public/share/${shareId}/download${password ? `?${params}` : ''}`;
+            const downloadUrl = `http://localhost:8000/api/public/share/${shareId}/download${accessToken ? `?${params}` : ''}`;
 
             // Create temporary link and trigger download
             const link = window.document.createElement('a');
@@ -171,6 +171,7 @@ export default function VerifierDashboard() {
                                 >
                                     <option value="oldest">Oldest First</option>
                                     <option value="newest">Newest First</option>
+                                    <option value="priority">Riskiest Flagged First</option>
                                 </select>
                                 <ChevronDown className="absolute right-3 top-1/2 -translate-y-1/2 w-4 h-4 text-slate-400 pointer-events-none" />
                             </div>
@@ -1,10 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from pydantic import BaseModel
 from bson import ObjectId
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Optional, List
-from app.database import get_database
+import re
+from app.database import get_database, find_users_by_ids
 from app.api.auth import get_current_user
+from app.core.auth import invalidate_user
+from app.core.pagination import keyset_sort, apply_cursor, next_cursor
+from app.core.security import get_password_hash_async
+from app.services.admin_stats import admin_stats
 
 router = APIRouter(prefix="/api/admin", tags=["Admin"])
 
@@ -37,53 +42,8 @@ class ResetPasswordRequest(BaseModel):
 @router.get("/stats")
 async def get_admin_stats(admin: dict = Depends(require_admin)):
     """Get system-wide statistics for admin dashboard"""
-    db = get_database()
-    
-    # Count users by role
-    total_users = await db.users.count_documents({})
-    admin_users = await db.users.count_documents({"role": "admin"})
-    verifier_users = await db.users.count_documents({"role": "verifier"})
-    regular_users = await db.users.count_documents({"role": "user"})
-    
-    # Count documents by status
-    total_documents = await db.documents.count_documents({})
-    verified_docs = await db.documents.count_documents({"verificationStatus": "verified"})
-    pending_docs = await db.documents.count_documents({"verificationStatus": "pending"})
-    flagged_docs = await db.documents.count_documents({"verificationStatus": "flagged"})
-    
-    
-    # Active users (users who have uploaded documents)
-    week_ago = datetime.utcnow() - timedelta(days=7)
-    active_user_ids = await db.documents.distinct("userId", {})
-    active_users = len(active_user_ids)
-    
-    # Storage calculation (sum of all document sizes)
-    pipeline = [
-        {"$group": {"_id": None, "totalSize": {"$sum": "$fileSize"}}}
-    ]
-    storage_result = await db.documents.aggregate(pipeline).to_list(1)
-    total_storage = storage_result[0]["totalSize"] if storage_result else 0
-    
-    return {
-        "users": {
-            "total": total_users,
-            "admins": admin_users,
-            "verifiers": verifier_users,
-            "regular": regular_users,
-            "active_7d": active_users
-        },
-        "documents": {
-            "total": total_documents,
-            "verified": verified_docs,
-            "pending": pending_docs,
-            "flagged": flagged_docs
-        },
-        "storage": {
-            "total_bytes": total_storage,
-            "total_mb": round(total_storage / (1024 * 1024), 2),
-            "total_gb": round(total_storage / (1024 * 1024 * 1024), 2)
-        }
-    }
+    # Served from a snapshot refreshed in the background instead of counting per request
+    return await admin_stats.get()
 
 # Get all users with pagination
 @router.get("/users")
@@ -93,6 +53,7 @@ async def get_all_users(
     status: Optional[str] = None,
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque nextCursor from the previous page; takes precedence over page"),
     admin: dict = Depends(require_admin)
 ):
     """Get all users with filtering and pagination"""
@@ -103,8 +64,8 @@ async def get_all_users(
     # Search filter
     if search:
         query["$or"] = [
-            {"name": {"$regex": search, "$options": "i"}},
-            {"email": {"$regex": search, "$options": "i"}}
+            {"name": {"$regex": re.escape(search), "$options": "i"}},
+            {"email": {"$regex": re.escape(search), "$options": "i"}}
         ]
     
     # Role filter
@@ -120,18 +81,24 @@ async def get_all_users(
             {"banned": False}
         ]
     
-    # Get total count
-    total = await db.users.count_documents(query)
+    # Get total count (from collection metadata when unfiltered)
+    total = await db.users.count_documents(query) if query else await db.users.estimated_document_count()
     
     # Get paginated users
-    skip = (page - 1) * limit
-    cursor = db.users.find(query).skip(skip).limit(limit).sort("createdAt", -1)
-    users = await cursor.to_list(length=limit)
+    sort = keyset_sort("createdAt", -1)
+    skip = 0 if cursor else (page - 1) * limit
+    users = await db.users.find(apply_cursor(query, sort, cursor)).sort(sort).skip(skip).limit(limit).to_list(length=limit)
+    
+    # Document counts for the whole page in one grouped aggregation
+    count_results = await db.documents.aggregate([
+        {"$match": {"userId": {"$in": [user["_id"] for user in users]}}},
+        {"$group": {"_id": "$userId", "count": {"$sum": 1}}}
+    ]).to_list(length=None)
+    doc_counts = {result["_id"]: result["count"] for result in count_results}
     
-    # Get document count for each user
     user_list = []
     for user in users:
-        doc_count = await db.documents.count_documents({"userId": user["_id"]})
+        doc_count = doc_counts.get(user["_id"], 0)
         user_list.append({
             "id": str(user["_id"]),
             "name": user.get("name", ""),
@@ -148,7 +115,8 @@ async def get_all_users(
         "total": total,
         "page": page,
         "limit": limit,
-        "pages": (total + limit - 1) // limit
+        "pages": (total + limit - 1) // limit,
+        "nextCursor": next_cursor(users, sort, limit)
     }
 
 # Update user role
@@ -180,6 +148,9 @@ async def update_user_role(
             detail="User not found"
         )
     
+    invalidate_user(user_id=user_id)
+    admin_stats.invalidate()
+    
     return {"success": True, "role": request.role}
 
 # Update user status (ban/unban)
@@ -205,6 +176,8 @@ async def update_user_status(
             detail="User not found"
         )
     
+    invalidate_user(user_id=user_id)
+    
     return {"success": True, "status": request.status}
 
 # Delete user permanently
@@ -230,6 +203,12 @@ async def delete_user(
     # Delete user
     await db.users.delete_one({"_id": ObjectId(user_id)})
     
+    invalidate_user(email=user.get("email"), user_id=user_id)
+    admin_stats.invalidate()
+    
+    from app.services.retrieval_index import retrieval_index
+    retrieval_index.drop_user(user_id)
+    
     return {
         "success": True,
         "message": f"User {user.get('email')} and all their documents deleted"
@@ -260,9 +239,7 @@ async def create_user(
         )
     
     # Hash password
-    from passlib.context import CryptContext
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-    hashed_password = pwd_context.hash(request.password)
+    hashed_password = await get_password_hash_async(request.password)
     
     # Create user
     new_user = {
@@ -277,6 +254,7 @@ async def create_user(
     }
     
     result = await db.users.insert_one(new_user)
+    admin_stats.invalidate()
     
     return {
         "success": True,
@@ -304,9 +282,7 @@ async def reset_user_password(
         )
     
     # Hash new password
-    from passlib.context import CryptContext
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-    hashed_password = pwd_context.hash(request.new_password)
+    hashed_password = await get_password_hash_async(request.new_password)
     
     # Update password
     await db.users.update_one(
@@ -317,6 +293,7 @@ async def reset_user_password(
             "updatedAt": datetime.utcnow()
         }}
     )
+    invalidate_user(email=user.get("email"), user_id=user_id)
     
     return {
         "success": True,
@@ -328,19 +305,22 @@ async def reset_user_password(
 async def get_activity_log(
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque nextCursor from the previous page; takes precedence over page"),
     admin: dict = Depends(require_admin)
 ):
     """Get recent system activity (placeholder - can be expanded)"""
     db = get_database()
     
     # For now, get recent document uploads as activity
-    skip = (page - 1) * limit
-    cursor = db.documents.find({}).sort("createdAt", -1).skip(skip).limit(limit)
-    docs = await cursor.to_list(length=limit)
+    sort = keyset_sort("createdAt", -1)
+    skip = 0 if cursor else (page - 1) * limit
+    docs = await db.documents.find(apply_cursor({}, sort, cursor)).sort(sort).skip(skip).limit(limit).to_list(length=limit)
+    
+    owners = await find_users_by_ids([doc.get("userId") for doc in docs], {"name": 1})
     
     activities = []
     for doc in docs:
-        user = await db.users.find_one({"_id": doc["userId"]})
+        user = owners.get(str(doc.get("userId")))
         activities.append({
             "id": str(doc["_id"]),
             "action": "document_upload",
@@ -349,11 +329,13 @@ async def get_activity_log(
             "timestamp": doc.get("createdAt", datetime.utcnow()).isoformat()
         })
     
-    total = await db.documents.count_documents({})
+    # Unfiltered, so the collection metadata count avoids a full scan
+    total = await db.documents.estimated_document_count()
     
     return {
         "activities": activities,
         "total": total,
         "page": page,
-        "limit": limit
+        "limit": limit,
+        "nextCursor": next_cursor(docs, sort, limit)
     }
@@ -1,12 +1,21 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.responses import StreamingResponse
-from pydantic import BaseModel
-from typing import List
-from groq import Groq
+from starlette.background import BackgroundTask
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
 from app.config import settings
+from app.core.security import decode_access_token
+from app.core.auth import get_user_by_email
+from app.services.groq_client import create_groq_client
+from app.services.chat_memory import chat_memory
+from app.services.retrieval_index import retrieval_index
+import asyncio
+import inspect
 import json
 
 router = APIRouter(prefix="/api/ai", tags=["AI"])
+optional_security = HTTPBearer(auto_error=False)
 
 class ChatMessage(BaseModel):
     role: str
@@ -14,14 +23,88 @@ class ChatMessage(BaseModel):
 
 class ChatRequest(BaseModel):
     messages: List[ChatMessage]
+    # With a session_id only the new message(s) need to be sent; history is kept server-side
+    session_id: Optional[str] = Field(None, min_length=8, max_length=64)
+    # Ground answers in the signed-in user's own documents
+    use_documents: bool = True
 
 # Initialize Groq client
-groq_client = Groq(api_key=settings.GROQ_API_KEY)
+groq_client = create_groq_client()
+
+# Open chat streams per user (or per client IP for anonymous callers)
+active_streams: Dict[str, int] = {}
+
+# Keep references to memory updates and upstream closes running after the response has finished
+pending_tasks = set()
+
+def keep_task(coro) -> asyncio.Task:
+    """Run a coroutine detached from the response, holding a reference until it is done"""
+    task = asyncio.create_task(coro)
+    pending_tasks.add(task)
+    task.add_done_callback(pending_tasks.discard)
+    return task
+
+async def get_client_key(
+    http_request: Request,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
+) -> str:
+    """Identify the caller for concurrency limiting"""
+    if credentials:
+        payload = decode_access_token(credentials.credentials)
+        if payload and payload.get("sub"):
+            return f"user:{payload['sub']}"
+    return f"ip:{http_request.client.host if http_request.client else 'unknown'}"
+
+def release_stream_slot(client_key: str):
+    """Give back a concurrency slot once a stream has finished"""
+    remaining = active_streams.get(client_key, 0) - 1
+    if remaining > 0:
+        active_streams[client_key] = remaining
+    else:
+        active_streams.pop(client_key, None)
+
+async def build_document_context(client_key: str, query: str) -> Optional[dict]:
+    """Retrieve the user's most relevant document passages for the prompt"""
+    if not client_key.startswith("user:") or not query.strip():
+        return None
+
+    user = await get_user_by_email(client_key[len("user:"):])
+    if not user or user.get("banned", False):
+        return None
+
+    passages = await retrieval_index.search(str(user["_id"]), query, settings.CHAT_RETRIEVAL_TOP_K)
+    if not passages:
+        return None
+
+    excerpts = "\n\n".join(
+        f"[{i}] {p['file_name']}:\n{p['text']}" for i, p in enumerate(passages, 1)
+    )
+    return {
+        "role": "system",
+        "content": (
+            "Relevant excerpts from the user's own uploaded documents. Use them to answer "
+            "questions about those documents and mention the file name you relied on. "
+            "If they do not contain the answer, say so.\n\n" + excerpts
+        )
+    }
+
+async def close_upstream(stream):
+    """Close the upstream Groq stream so the connection is released immediately"""
+    close = getattr(stream, "close", None) or getattr(stream, "aclose", None)
+    try:
+        if close:
+            result = close()
+            if inspect.isawaitable(result):
+                await result
+        elif getattr(stream, "response", None) is not None:
+            await stream.response.aclose()
+    except Exception as e:
+        print(f"⚠️ Failed to close chat stream: {e}")
 
 @router.post("/chat")
-async def chat(request: ChatRequest):
+async def chat(request: ChatRequest, client_key: str = Depends(get_client_key)):
     """AI chatbot with streaming responses"""
-    
+
     # System prompt
     system_message = {
         "role": "system",
@@ -43,28 +126,129 @@ Platform features:
 
 Keep responses helpful and under 200 words unless asked for detailed explanations."""
     }
-    
-    # Prepare messages
-    all_messages = [system_message] + [msg.model_dump() for msg in request.messages]
-    
+
+    # Per-user concurrency cap, checked before any lookup so a caller at the cap costs nothing
+    if active_streams.get(client_key, 0) >= settings.CHAT_MAX_CONCURRENT_PER_USER:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many chat responses in progress. Please wait for the current one to finish."
+        )
+    active_streams[client_key] = active_streams.get(client_key, 0) + 1
+
+    # Until the stream starts, any error gives the slot back
     try:
-        # Create streaming response
-        async def generate():
-            stream = groq_client.chat.completions.create(
+        # Prepare messages
+        new_messages = [msg.model_dump() for msg in request.messages]
+        if request.session_id:
+            session = await chat_memory.load_session(request.session_id, client_key)
+            if session is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Chat session not found"
+                )
+            all_messages = chat_memory.build_messages(system_message, session, new_messages)
+        else:
+            all_messages = [system_message] + new_messages
+
+        if request.use_documents:
+            last_user_message = next((m["content"] for m in reversed(new_messages) if m["role"] == "user"), "")
+            context_message = await build_document_context(client_key, last_user_message)
+            if context_message:
+                all_messages.insert(1, context_message)
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.CHAT_STREAM_TIMEOUT_SECONDS
+
+        stream = await asyncio.wait_for(
+            groq_client.chat.completions.create(
                 model=settings.GROQ_MODEL,
                 messages=all_messages,
                 stream=True,
                 temperature=0.7,
                 max_tokens=500
-            )
-            
-            for chunk in stream:
-                if chunk.choices[0].delta.content:
-                    yield f"data: {json.dumps({'content': chunk.choices[0].delta.content})}\n\n"
-            
-            yield "data: [DONE]\n\n"
-        
-        return StreamingResponse(generate(), media_type="text/event-stream")
-    
+            ),
+            timeout=settings.CHAT_STREAM_TIMEOUT_SECONDS
+        )
+    except HTTPException:
+        release_stream_slot(client_key)
+        raise
+    except asyncio.TimeoutError:
+        release_stream_slot(client_key)
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail="AI service timed out")
     except Exception as e:
+        release_stream_slot(client_key)
         raise HTTPException(status_code=500, detail=str(e))
+    except BaseException:
+        # e.g. cancelled by a client disconnect
+        release_stream_slot(client_key)
+        raise
+
+    finished = False
+    reply_parts = []
+
+    async def finish():
+        """Close upstream, free the slot and update session memory exactly once"""
+        nonlocal finished
+        if finished:
+            return
+
+        # Free the slot before any await: on a client disconnect this runs in a
+        # cancelled scope, and the first await raises CancelledError
+        release_stream_slot(client_key)
+
+        # Summarizing can take a model round trip, so it runs detached from the response
+        if request.session_id and reply_parts:
+            keep_task(chat_memory.append_turns(
+                request.session_id,
+                new_messages + [{"role": "assistant", "content": "".join(reply_parts)}]
+            ))
+        finished = True
+
+        # Shielded so a cancelled response still closes the upstream connection
+        await asyncio.shield(keep_task(close_upstream(stream)))
+
+    # Create streaming response - a client disconnect cancels this generator,
+    # and finish() closes the upstream stream (the background task covers
+    # disconnects that happen before the generator has started)
+    async def generate():
+        try:
+            iterator = stream.__aiter__()
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError()
+                try:
+                    chunk = await asyncio.wait_for(iterator.__anext__(), timeout=remaining)
+                except StopAsyncIteration:
+                    break
+
+                if chunk.choices and chunk.choices[0].delta.content:
+                    reply_parts.append(chunk.choices[0].delta.content)
+                    yield f"data: {json.dumps({'content': chunk.choices[0].delta.content})}\n\n"
+
+            yield "data: [DONE]\n\n"
+
+        except asyncio.TimeoutError:
+            yield f"data: {json.dumps({'error': 'Response timed out'})}\n\n"
+        except Exception as e:
+            yield f"data: {json.dumps({'error': str(e)})}\n\n"
+        finally:
+            await finish()
+
+    headers = {"X-Chat-Session-Id": request.session_id} if request.session_id else None
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers=headers,
+        background=BackgroundTask(finish)
+    )
+
+@router.delete("/chat/sessions/{session_id}")
+async def delete_chat_session(session_id: str, client_key: str = Depends(get_client_key)):
+    """Forget a server-side chat session"""
+    if not await chat_memory.delete_session(session_id, client_key):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Chat session not found"
+        )
+    return {"success": True, "message": "Chat session deleted"}
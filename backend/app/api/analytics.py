@@ -1,51 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import Optional
 from bson import ObjectId
 from datetime import datetime, timedelta
 
-from app.core.security import decode_access_token
+from app.core.auth import get_current_verifier
 from app.database import get_database
+from app.services.review_store import review_store
 
 router = APIRouter(prefix="/api/verifier", tags=["Verifier Analytics"])
-security = HTTPBearer()
-
-async def get_current_user_with_role(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    """Get current user with role verification"""
-    token = credentials.credentials
-    payload = decode_access_token(token)
-    
-    if payload is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials"
-        )
-    
-    email = payload.get("sub")
-    role = payload.get("role", "user")
-    
-    if role not in ["verifier", "admin"]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only verifiers can access this endpoint"
-        )
-    
-    db = get_database()
-    user = await db.users.find_one({"email": email})
-    
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found"
-        )
-    
-    return {"id": str(user["_id"]), "email": email, "role": role}
-
 
 @router.get("/analytics")
 async def get_verifier_analytics(
     days: int = Query(30, ge=1, le=365),
-    current_user: dict = Depends(get_current_user_with_role)
+    current_user: dict = Depends(get_current_verifier)
 ):
     """Get analytics data for verifier dashboard"""
     db = get_database()
@@ -54,94 +21,35 @@ async def get_verifier_analytics(
     end_date = datetime.utcnow()
     start_date = end_date - timedelta(days=days)
     
-    # Get all documents with review history in the date range
-    pipeline = [
-        {
-            "$match": {
-                "review_history": {"$exists": True, "$ne": []}
-            }
-        },
-        {"$unwind": "$review_history"},
-        {
-            "$match": {
-                "review_history.reviewed_at": {"$gte": start_date, "$lte": end_date}
-            }
-        },
-        {
-            "$group": {
-                "_id": None,
-                "total_reviews": {"$sum": 1},
-                "approved": {
-                    "$sum": {"$cond": [{"$eq": ["$review_history.decision", "approved"]}, 1, 0]}
-                },
-                "rejected": {
-                    "$sum": {"$cond": [{"$eq": ["$review_history.decision", "rejected"]}, 1, 0]}
-                },
-                "flagged": {
-                    "$sum": {"$cond": [{"$eq": ["$review_history.decision", "flagged"]}, 1, 0]}
-                }
-            }
-        }
-    ]
-    
-    overview_result = await db.documents.aggregate(pipeline).to_list(length=1)
-    
-    if not overview_result:
-        overview = {
-            "total_reviews": 0,
-            "approved": 0,
-            "rejected": 0,
-            "flagged": 0,
-            "approval_rate": 0
-        }
-    else:
-        stats = overview_result[0]
-        total = stats["total_reviews"]
-        overview = {
-            "total_reviews": total,
-            "approved": stats["approved"],
-            "rejected": stats["rejected"],
-            "flagged": stats["flagged"],
-            "approval_rate": round((stats["approved"] / total * 100) if total > 0 else 0, 1)
-        }
-    
-    # Get daily trends
+    # Daily counters from the review rollups: cost grows with the window, not the review log
     daily_pipeline = [
         {
             "$match": {
-                "review_history": {"$exists": True, "$ne": []}
-            }
-        },
-        {"$unwind": "$review_history"},
-        {
-            "$match": {
-                "review_history.reviewed_at": {"$gte": start_date, "$lte": end_date}
+                "day": {
+                    "$gte": review_store.rollup_day(start_date),
+                    "$lte": review_store.rollup_day(end_date)
+                }
             }
         },
         {
             "$group": {
-                "_id": {
-                    "$dateToString": {
-                        "format": "%Y-%m-%d",
-                        "date": "$review_history.reviewed_at"
-                    }
-                },
-                "total": {"$sum": 1},
+                "_id": "$day",
+                "total": {"$sum": "$count"},
                 "approved": {
-                    "$sum": {"$cond": [{"$eq": ["$review_history.decision", "approved"]}, 1, 0]}
+                    "$sum": {"$cond": [{"$eq": ["$decision", "approved"]}, "$count", 0]}
                 },
                 "rejected": {
-                    "$sum": {"$cond": [{"$eq": ["$review_history.decision", "rejected"]}, 1, 0]}
+                    "$sum": {"$cond": [{"$eq": ["$decision", "rejected"]}, "$count", 0]}
                 },
                 "flagged": {
-                    "$sum": {"$cond": [{"$eq": ["$review_history.decision", "flagged"]}, 1, 0]}
+                    "$sum": {"$cond": [{"$eq": ["$decision", "flagged"]}, "$count", 0]}
                 }
             }
         },
         {"$sort": {"_id": 1}}
     ]
     
-    daily_results = await db.documents.aggregate(daily_pipeline).to_list(length=None)
+    daily_results = await db.review_rollups.aggregate(daily_pipeline).to_list(length=None)
     daily_trends = [
         {
             "date": result["_id"],
@@ -153,36 +61,41 @@ async def get_verifier_analytics(
         for result in daily_results
     ]
     
+    # Overview is the sum of the daily buckets
+    total = sum(day["total"] for day in daily_trends)
+    approved = sum(day["approved"] for day in daily_trends)
+    overview = {
+        "total_reviews": total,
+        "approved": approved,
+        "rejected": sum(day["rejected"] for day in daily_trends),
+        "flagged": sum(day["flagged"] for day in daily_trends),
+        "approval_rate": round((approved / total * 100) if total > 0 else 0, 1)
+    }
+    
     # Get recent activity (last 20 reviews)
     recent_pipeline = [
         {
             "$match": {
-                "review_history": {"$exists": True, "$ne": []}
-            }
-        },
-        {"$unwind": "$review_history"},
-        {
-            "$match": {
-                "review_history.reviewed_at": {"$gte": start_date}
+                "reviewed_at": {"$gte": start_date}
             }
         },
         {
             "$project": {
-                "fileName": 1,
-                "decision": "$review_history.decision",
-                "reviewer_name": "$review_history.reviewer_name",
-                "reviewed_at": "$review_history.reviewed_at",
-                "notes": "$review_history.notes"
+                "document_name": 1,
+                "decision": 1,
+                "reviewer_name": 1,
+                "reviewed_at": 1,
+                "notes": 1
             }
         },
         {"$sort": {"reviewed_at": -1}},
         {"$limit": 20}
     ]
     
-    recent_results = await db.documents.aggregate(recent_pipeline).to_list(length=20)
+    recent_results = await db.reviews.aggregate(recent_pipeline).to_list(length=20)
     recent_activity = [
         {
-            "document_name": result["fileName"],
+            "document_name": result.get("document_name", "document"),
             "status": result["decision"],
             "reviewer_name": result.get("reviewer_name", "Unknown"),
             "reviewed_at": result["reviewed_at"].isoformat(),
@@ -2,7 +2,8 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from datetime import timedelta
 from app.schemas.user import UserCreate, UserLogin, Token, User
-from app.core.security import verify_password, get_password_hash, create_access_token, decode_access_token
+from app.core.security import verify_password_async, get_password_hash_async, create_access_token, decode_access_token
+from app.core.auth import get_authenticated_user, invalidate_user
 from app.database import get_database
 from app.config import settings
 
@@ -24,7 +25,7 @@ async def register(user: UserCreate):
     
     # Create new user
     user_dict = user.model_dump()
-    user_dict["hashed_password"] = get_password_hash(user_dict.pop("password"))
+    user_dict["hashed_password"] = await get_password_hash_async(user_dict.pop("password"))
     user_dict["role"] = "user"
     user_dict["subscription"] = {"plan": "free", "status": "active"}
     
@@ -49,7 +50,7 @@ async def login(credentials: UserLogin):
     # Support both 'password' and 'hashed_password' field names for backwards compatibility
     password_field = user.get("hashed_password") or user.get("password") if user else None
     
-    if not user or not password_field or not verify_password(credentials.password, password_field):
+    if not user or not password_field or not await verify_password_async(credentials.password, password_field):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -77,56 +78,8 @@ async def login(credentials: UserLogin):
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.get("/me", response_model=User)
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+async def get_current_user(user: dict = Depends(get_authenticated_user)):
     """Get current authenticated user"""
-    token = credentials.credentials
-    payload = decode_access_token(token)
-    
-    if payload is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    email = payload.get("sub")
-    if email is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials"
-        )
-    
-    db = get_database()
-    user = await db.users.find_one({"email": email})
-    
-    if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found"
-        )
-    
-    # Check if password was changed after token was issued (invalidate old sessions)
-    token_pwd_changed_at = payload.get("pwd_changed_at")
-    user_pwd_changed_at = user.get("password_changed_at")
-    
-    if user_pwd_changed_at:
-        # If user has password_changed_at but token doesn't, or they don't match - token is invalid
-        from datetime import datetime
-        user_pwd_time = user_pwd_changed_at.isoformat() if isinstance(user_pwd_changed_at, datetime) else str(user_pwd_changed_at)
-        
-        if token_pwd_changed_at != user_pwd_time:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Session expired due to password change. Please login again.",
-            )
-    
-    # Check if user is banned - CRITICAL SECURITY CHECK
-    if user.get("banned", False):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Account has been suspended",
-        )
-    
     # Convert ObjectId to string
     if "_id" in user:
         user["_id"] = str(user["_id"])
@@ -134,43 +87,12 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     return user
 
 @router.get("/me")
-async def get_current_user_info(credentials: HTTPAuthorizationCredentials = Depends(security)):
+async def get_current_user_info(user: dict = Depends(get_authenticated_user)):
     """Get current user with role"""
-    token = credentials.credentials
-    payload = decode_access_token(token)
-    
-    if not payload:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication"
-        )
-    
-    email = payload.get("sub")
-    db = get_database()
-    user = await db.users.find_one({"email": email})
-    
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
-    
-    # Ensure name is never None
-    user_name = user.get("name")
-    if user_name is None:
-        user_name = ""
-    
-    # Check if user is banned
-    if user.get("banned", False):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Account has been suspended",
-        )
-    
     return {
         "id": str(user["_id"]),
         "email": user["email"],
-        "name": user_name,
+        "name": user.get("name") or "",
         "role": user.get("role", "user"),
         "banned": user.get("banned", False)
     }
@@ -204,6 +126,7 @@ async def update_profile(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Failed to update profile"
         )
+    invalidate_user(email=email)
     
     # Return updated user
     user = await db.users.find_one({"email": email})
@@ -238,14 +161,14 @@ async def change_password(
         )
     
     # Verify current password
-    if not verify_password(password_data.get("current_password"), user["hashed_password"]):
+    if not await verify_password_async(password_data.get("current_password"), user["hashed_password"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Current password is incorrect"
         )
     
     # Update password
-    hashed_password = get_password_hash(password_data.get("new_password"))
+    hashed_password = await get_password_hash_async(password_data.get("new_password"))
     from datetime import datetime
     await db.users.update_one(
         {"email": email},
@@ -254,5 +177,6 @@ async def change_password(
             "password_changed_at": datetime.utcnow()
         }}
     )
+    invalidate_user(email=email)
     
     return {"success": True, "message": "Password changed successfully"}
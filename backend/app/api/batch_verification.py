@@ -1,5 +1,4 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import List
 from bson import ObjectId
 from datetime import datetime
@@ -7,35 +6,12 @@ import time
 import asyncio
 
 from app.schemas.verification import AIAnalysisRequest
-from app.core.security import decode_access_token
+from app.core.auth import get_current_user_id
+from app.core.review_priority import review_fields
 from app.database import get_database
 from app.services.document_analyzer import document_analyzer
 
 router = APIRouter(prefix="/api/verification", tags=["Verification - Batch"])
-security = HTTPBearer()
-
-async def get_current_user_id(credentials: HTTPAuthorizationCredentials = Depends(security)) -> str:
-    """Get current user ID from JWT token"""
-    token = credentials.credentials
-    payload = decode_access_token(token)
-    
-    if payload is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials"
-        )
-    
-    email = payload.get("sub")
-    db = get_database()
-    user = await db.users.find_one({"email": email})
-    
-    if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found"
-        )
-    
-    return str(user["_id"])
 
 @router.post("/analyze/batch")
 async def batch_analyze_documents(
@@ -105,6 +81,7 @@ async def batch_analyze_documents(
                     {
                         "$set": {
                             "aiAnalysis": analysis,
+                            **review_fields(analysis, document["createdAt"]),
                             "verificationStatus": "analyzed",
                             "updatedAt": datetime.utcnow()
                         }
@@ -113,7 +90,7 @@ async def batch_analyze_documents(
                 
                 results.append({
                     "document_id": doc_id,
-                    "status": "analyzed",
+                    "status": "provisional" if analysis.get("provisional") else "analyzed",
                     "analysis": analysis
                 })
             else:
@@ -122,8 +99,9 @@ async def batch_analyze_documents(
                     "error": analysis.get("error", "Analysis failed")
                 })
             
-            # Small delay to avoid API rate limits
-            await asyncio.sleep(0.5)
+            # Small delay to avoid API rate limits (no upstream call in degraded mode)
+            if not analysis.get("provisional"):
+                await asyncio.sleep(0.5)
         
         except Exception as e:
             errors.append({
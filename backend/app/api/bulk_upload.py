@@ -1,69 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import List
 from bson import ObjectId
 from datetime import datetime
 
 from app.schemas.document import UploadResponse, DocumentResponse
-from app.core.security import decode_access_token
+from app.core.auth import get_current_user_id
+from app.core.review_priority import queue_rank
 from app.database import get_database
 from app.services.file_manager import file_manager
 from app.services.text_extractor import extract_text
 from app.services.signing_service import signing_service
+from app.services.retrieval_index import retrieval_index
 from app.config import settings
 
 router = APIRouter(prefix="/api/documents", tags=["Documents - Bulk Upload"])
-security = HTTPBearer()
-
-async def get_current_user_id(credentials: HTTPAuthorizationCredentials = Depends(security)) -> str:
-    """Get current user ID from JWT token"""
-    token = credentials.credentials
-    payload = decode_access_token(token)
-    
-    if payload is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials"
-        )
-    
-    email = payload.get("sub")
-    if email is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials"
-        )
-    
-    db = get_database()
-    user = await db.users.find_one({"email": email})
-    
-    if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found"
-        )
-    
-    # Check if password was changed after token was issued
-    token_pwd_changed_at = payload.get("pwd_changed_at")
-    user_pwd_changed_at = user.get("password_changed_at")
-    
-    if user_pwd_changed_at:
-        from datetime import datetime
-        user_pwd_time = user_pwd_changed_at.isoformat() if isinstance(user_pwd_changed_at, datetime) else str(user_pwd_changed_at)
-        
-        if token_pwd_changed_at != user_pwd_time:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Session expired due to password change. Please login again."
-            )
-    
-    # Check if user is banned
-    if user.get("banned", False):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Account has been suspended"
-        )
-    
-    return str(user["_id"])
 
 @router.post("/upload/bulk")
 async def upload_multiple_documents(
@@ -139,10 +89,12 @@ async def upload_multiple_documents(
                 "createdAt": datetime.utcnow(),
                 "updatedAt": datetime.utcnow()
             }
+            document["queueRank"] = queue_rank(document["createdAt"])
             
             # Insert into database
             db = get_database()
             result = await db.documents.insert_one(document)
+            retrieval_index.add_document(user_id, str(result.inserted_id), file.filename, extracted_text)
             
             results.append(DocumentResponse(
                 id=str(result.inserted_id),
@@ -3,7 +3,7 @@ from pydantic import BaseModel
 from bson import ObjectId
 from datetime import datetime
 from app.database import get_database
-from app.api.documents import get_current_user_id
+from app.core.auth import get_current_user_id
 
 router = APIRouter(prefix="/api/documents", tags=["Document Category"])
 
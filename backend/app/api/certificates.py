@@ -1,39 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.responses import FileResponse
 from bson import ObjectId
 from datetime import datetime
 from pathlib import Path
 
-from app.core.security import decode_access_token
+from app.core.auth import get_current_user_id
 from app.database import get_database
 from app.services.certificate_generator import certificate_generator
 
 router = APIRouter(prefix="/api/certificates", tags=["Certificates"])
-security = HTTPBearer()
-
-async def get_current_user_id(credentials: HTTPAuthorizationCredentials = Depends(security)) -> str:
-    """Get current user ID from JWT token"""
-    token = credentials.credentials
-    payload = decode_access_token(token)
-    
-    if payload is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials"
-        )
-    
-    email = payload.get("sub")
-    db = get_database()
-    user = await db.users.find_one({"email": email})
-    
-    if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found"
-        )
-    
-    return str(user["_id"])
 
 @router.post("/generate/{document_id}")
 async def generate_certificate(
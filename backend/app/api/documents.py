@@ -1,49 +1,59 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi import APIRouter, Depends, HTTPException, Response, UploadFile, File, status
 from typing import List, Optional
 from bson import ObjectId
 from datetime import datetime, timedelta
+import re
 
 from app.schemas.document import DocumentResponse, UploadResponse
-from app.core.security import decode_access_token
+from app.core.auth import get_current_user_id
+from app.core.pagination import keyset_sort, apply_cursor, next_cursor
+from app.core.fields import parse_fields, projection_for, pick
+from app.core.review_priority import queue_rank
 from app.database import get_database
 from app.services.file_manager import file_manager
 from app.services.text_extractor import extract_text
 from app.services.signing_service import signing_service
+from app.services.retrieval_index import retrieval_index
 from app.config import settings
 
 router = APIRouter(prefix="/api/documents", tags=["Documents"])
-security = HTTPBearer()
 
-async def get_current_user_id(credentials: HTTPAuthorizationCredentials = Depends(security)) -> str:
-    """Get current user ID from JWT token"""
-    token = credentials.credentials
-    payload = decode_access_token(token)
-    
-    if payload is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials"
-        )
-    
-    email = payload.get("sub")
-    if email is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials"
-        )
-    
-    # Get user ID from database
-    db = get_database()
-    user = await db.users.find_one({"email": email})
-    
-    if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found"
-        )
-    
-    return str(user["_id"])
+# Response fields of the document list and the stored fields they are built from
+LIST_FIELDS = {
+    "id": ["_id"],
+    "fileName": ["fileName"],
+    "fileSize": ["fileSize"],
+    "fileType": ["fileType"],
+    "category": ["metadata.category"],
+    "uploadedAt": ["createdAt"],
+    "verificationStatus": ["verificationStatus"],
+    "fileHash": ["fileHash"],
+    "reviewHistory": ["review_history"]
+}
+
+# Response fields of document details (the public fields of schemas.document.Document)
+# and the stored fields they are built from
+DETAIL_FIELDS = {
+    "_id": ["_id"],
+    "userId": ["userId"],
+    "fileName": ["fileName"],
+    "originalName": ["originalName"],
+    "fileType": ["fileType"],
+    "fileSize": ["fileSize"],
+    "fileHash": ["fileHash"],
+    "metadata": ["metadata"],
+    "extractedText": ["extractedText"],
+    "aiAnalysis": ["aiAnalysis"],
+    "verificationStatus": ["verificationStatus"],
+    "verificationCount": ["verificationCount"],
+    "downloadCount": ["downloadCount"],
+    "createdAt": ["createdAt"],
+    "updatedAt": ["updatedAt"],
+    "reviewHistory": ["review_history"]
+}
+
+# extractedText is large and only returned when requested with fields=
+DEFAULT_DETAIL_FIELDS = [f for f in DETAIL_FIELDS if f != "extractedText"]
 
 @router.post("/upload", response_model=UploadResponse)
 async def upload_document(
@@ -152,10 +162,12 @@ async def upload_document(
             "createdAt": datetime.utcnow(),
             "updatedAt": datetime.utcnow()
         }
+        document["queueRank"] = queue_rank(document["createdAt"])
         
         # Insert into database
         db = get_database()
         result = await db.documents.insert_one(document)
+        retrieval_index.add_document(user_id, str(result.inserted_id), file.filename, extracted_text)
         
         # Return response
         return UploadResponse(
@@ -181,6 +193,7 @@ async def upload_document(
 
 @router.get("/")
 async def list_documents(
+    response: Response,
     user_id: str = Depends(get_current_user_id),
     search: Optional[str] = None,
     status_filter: Optional[str] = None,
@@ -198,6 +211,8 @@ async def list_documents(
     sort_order: str = "desc",
     page: int = 1,
     limit: int = 10,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
     include_deleted: bool = False
 ):
     """
@@ -211,6 +226,8 @@ async def list_documents(
     - sort_order: Sort order (asc/desc)
     - page: Page number (default: 1)
     - limit: Items per page (default: 10, max: 100)
+    - cursor: Opaque cursor from the X-Next-Cursor header; takes precedence over page
+    - fields: Comma-separated response fields to return (default: all)
     - include_deleted: Include deleted documents (default: false)
     """
     db = get_database()
@@ -223,7 +240,7 @@ async def list_documents(
     
     # Add search filter
     if search:
-        query["fileName"] = {"$regex": search, "$options": "i"}
+        query["fileName"] = {"$regex": re.escape(search), "$options": "i"}
     
     # Add status filter
     if status_filter and status_filter != "all":
@@ -277,14 +294,25 @@ async def list_documents(
     
     # Calculate pagination
     limit = min(limit, 100)  # Max 100 items per page
-    skip = (page - 1) * limit
+    skip = 0 if cursor else (page - 1) * limit
     
     # Build sort
+    if sort_by not in ["createdAt", "fileName", "fileSize"]:
+        sort_by = "createdAt"
     sort_direction = 1 if sort_order == "asc" else -1
+    sort = keyset_sort(sort_by, sort_direction)
+    
+    # Only load what the response needs (plus the sort key for the cursor)
+    selected = parse_fields(fields, LIST_FIELDS)
+    projection = projection_for(LIST_FIELDS, selected, always=[sort_by])
     
     # Get documents
-    cursor = db.documents.find(query).sort(sort_by, sort_direction).skip(skip).limit(limit)
-    documents = await cursor.to_list(length=limit)
+    documents = await db.documents.find(apply_cursor(query, sort, cursor), projection).sort(sort).skip(skip).limit(limit).to_list(length=limit)
+    
+    # The response body is a bare list, so the next page cursor goes in a header
+    next_page = next_cursor(documents, sort, limit)
+    if next_page:
+        response.headers["X-Next-Cursor"] = next_page
     
     # Helper function to serialize review history
     def serialize_review_history(history):
@@ -304,32 +332,41 @@ async def list_documents(
     # Build response with review history
     result = []
     for doc in documents:
-        result.append({
+        result.append(pick({
             "id": str(doc["_id"]),
-            "fileName": doc["fileName"],
-            "fileSize": doc["fileSize"],
-            "fileType": doc["fileType"],
-            "category": doc["metadata"].get("category", "other"),
-            "uploadedAt": doc["createdAt"].isoformat(),
-            "verificationStatus": doc["verificationStatus"],
-            "fileHash": doc["fileHash"],
+            "fileName": doc.get("fileName"),
+            "fileSize": doc.get("fileSize"),
+            "fileType": doc.get("fileType"),
+            "category": doc.get("metadata", {}).get("category", "other"),
+            "uploadedAt": doc["createdAt"].isoformat() if doc.get("createdAt") else None,
+            "verificationStatus": doc.get("verificationStatus"),
+            "fileHash": doc.get("fileHash"),
             "reviewHistory": serialize_review_history(doc.get("review_history", []))
-        })
+        }, selected))
     
     return result
 
 @router.get("/{document_id}")
 async def get_document(
     document_id: str,
+    fields: Optional[str] = None,
     user_id: str = Depends(get_current_user_id)
 ):
-    """Get document by ID"""
+    """
+    Get document by ID
+    
+    extractedText is only returned when listed in fields (comma-separated
+    names from DETAIL_FIELDS).
+    """
     db = get_database()
     
+    selected = parse_fields(fields, DETAIL_FIELDS) if fields else DEFAULT_DETAIL_FIELDS
+    projection = projection_for(DETAIL_FIELDS, selected, always=["userId"])
+    
     document = await db.documents.find_one({
         "_id": ObjectId(document_id),
         "userId": ObjectId(user_id)
-    })
+    }, projection)
     
     if not document:
         raise HTTPException(
@@ -338,7 +375,7 @@ async def get_document(
         )
     
     # Serialize review history
-    review_history = document.get("review_history", [])
+    review_history = document.pop("review_history", None)
     serialized_reviews = []
     if review_history:
         for review in review_history:
@@ -354,7 +391,7 @@ async def get_document(
     document["userId"] = str(document["userId"])
     document["reviewHistory"] = serialized_reviews
     
-    return document
+    return pick(document, selected)
 
 @router.delete("/{document_id}")
 async def delete_document(
@@ -387,6 +424,7 @@ async def delete_document(
             thumbnail_generator.delete_thumbnail(document["thumbnailUrl"])
         
         await db.documents.delete_one({"_id": ObjectId(document_id)})
+        retrieval_index.remove_document(user_id, document_id)
         return {"success": True, "message": "Document permanently deleted"}
     else:
         # Soft delete - mark as deleted
@@ -400,4 +438,5 @@ async def delete_document(
                 }
             }
         )
+        retrieval_index.remove_document(user_id, document_id)
         return {"success": True, "message": "Document moved to trash"}
@@ -1,55 +1,44 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import List, Optional
 from bson import ObjectId
 from datetime import datetime
 
 from app.schemas.verification_model import VerificationUpdate
-from app.core.security import decode_access_token
+from app.core.auth import get_authenticated_user
+from app.core.pagination import apply_cursor, next_cursor, keyset_sort
+from app.core.fields import parse_fields, projection_for, pick
 from app.database import get_database
+from app.services.review_queue import review_queue, ANALYZED_STATUSES, MANUAL_REVIEW_STATUSES
+from app.services.review_store import review_store
 
 router = APIRouter(prefix="/api/verification", tags=["Verification - Manual Review"])
-security = HTTPBearer()
 
-async def get_current_user_id(credentials: HTTPAuthorizationCredentials = Depends(security)) -> str:
-    """Get current user ID from JWT token"""
-    token = credentials.credentials
-    payload = decode_access_token(token)
-    
-    if payload is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials"
-        )
-    
-    email = payload.get("sub")
-    db = get_database()
-    user = await db.users.find_one({"email": email})
-    
-    if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found"
-        )
-    
-    return str(user["_id"])
+# Response fields of the flagged queue and the stored fields they are built from
+FLAGGED_FIELDS = {
+    "id": ["_id"],
+    "fileName": ["fileName"],
+    "userId": ["userId"],
+    "uploadedAt": ["createdAt"],
+    "aiAnalysis": ["aiAnalysis"],
+    "reviewPriority": ["reviewPriority"],
+    "verificationStatus": ["verificationStatus"]
+}
 
-async def get_user_role(user_id: str) -> str:
-    """Get user role from database"""
-    db = get_database()
-    user = await db.users.find_one({"_id": ObjectId(user_id)})
-    return user.get("role", "user") if user else "user"
+# Manual review queue order, backed by the status_queue_rank index
+FLAGGED_SORT = keyset_sort("queueRank", 1)
 
 @router.get("/queue/flagged")
 async def get_flagged_documents(
-    user_id: str = Depends(get_current_user_id),
+    current_user: dict = Depends(get_authenticated_user),
     skip: int = 0,
-    limit: int = 20
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None
 ):
     """Get queue of flagged documents for manual review (Verifier/Admin only)"""
     
     # Check if user is verifier or admin
-    role = await get_user_role(user_id)
+    role = current_user.get("role", "user")
     if role not in ['verifier', 'admin']:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -58,139 +47,160 @@ async def get_flagged_documents(
     
     db = get_database()
     
-    # Find documents with high risk or low authenticity
+    # High risk, low authenticity or flagged, as materialized when the analysis was saved
     query = {
-        "$or": [
-            {"aiAnalysis.riskLevel": {"$in": ["high", "critical"]}},
-            {"aiAnalysis.authenticityScore": {"$lt": 70}},
-            {"aiAnalysis.flags.0": {"$exists": True}}  # Has at least 1 flag
-        ],
-        "verificationStatus": {"$in": ["analyzed", "pending_review"]},
+        "needsReview": True,
+        "verificationStatus": {"$in": ANALYZED_STATUSES},
         "isDeleted": {"$ne": True}
     }
     
-    cursor = db.documents.find(query).sort("createdAt", -1).skip(skip).limit(limit)
-    documents = await cursor.to_list(length=limit)
+    # Risk-boosted waiting time (see app.core.review_priority.queue_rank), so risky
+    # documents go first without starving old ones; a cursor from nextCursor replaces skip
+    sort = FLAGGED_SORT
+    if cursor:
+        skip = 0
+    selected = parse_fields(fields, FLAGGED_FIELDS)
+    projection = projection_for(FLAGGED_FIELDS, selected, always=["queueRank", "createdAt"])
+    documents = await db.documents.find(apply_cursor(query, sort, cursor), projection).sort(sort).skip(skip).limit(limit).to_list(length=limit)
     
     # Get total count
     total_count = await db.documents.count_documents(query)
     
     return {
         "total": total_count,
+        "nextCursor": next_cursor(documents, sort, limit),
         "documents": [
-            {
+            pick({
                 "id": str(doc["_id"]),
-                "fileName": doc["fileName"],
-                "userId": str(doc["userId"]),
+                "fileName": doc.get("fileName"),
+                "userId": str(doc.get("userId")),
                 "uploadedAt": doc["createdAt"],
                 "aiAnalysis": doc.get("aiAnalysis"),
+                "reviewPriority": doc.get("reviewPriority", 0),
                 "verificationStatus": doc.get("verificationStatus")
-            }
+            }, selected)
             for doc in documents
         ]
     }
 
+@router.post("/queue/flagged/claim")
+async def claim_flagged_document(current_user: dict = Depends(get_authenticated_user)):
+    """Lease the next document of the manual review queue, in priority order"""
+    if current_user.get("role") not in ['verifier', 'admin']:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only verifiers can access review queue"
+        )
+    
+    verifier = {"id": str(current_user["_id"]), "name": current_user.get("name") or "Unknown"}
+    doc = await review_queue.claim(verifier, ANALYZED_STATUSES, FLAGGED_SORT, {"needsReview": True})
+    if not doc:
+        return {"document": None, "lease": None}
+    
+    return {
+        "document": {
+            "id": str(doc["_id"]),
+            "fileName": doc.get("fileName"),
+            "uploadedAt": doc["createdAt"],
+            "aiAnalysis": doc.get("aiAnalysis"),
+            "reviewPriority": doc.get("reviewPriority", 0),
+            "verificationStatus": doc.get("verificationStatus")
+        },
+        "lease": {"expires_at": doc["leaseExpiresAt"].isoformat()}
+    }
+
 @router.post("/{document_id}/review")
 async def manual_review(
     document_id: str,
     review: VerificationUpdate,
-    user_id: str = Depends(get_current_user_id)
+    current_user: dict = Depends(get_authenticated_user)
 ):
     """Manual review of a document by verifier"""
     
     # Check if user is verifier or admin
-    role = await get_user_role(user_id)
+    role = current_user.get("role", "user")
     if role not in ['verifier', 'admin']:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only verifiers can perform manual reviews"
         )
     
-    db = get_database()
-    
-    document = await db.documents.find_one({"_id": ObjectId(document_id)})
-    if not document:
+    if review.decision not in ["approved", "rejected", "flagged"]:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Document not found"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Decision must be approved, rejected or flagged"
         )
     
-    # Get reviewer name
-    reviewer = await db.users.find_one({"_id": ObjectId(user_id)})
-    reviewer_name = reviewer.get("name", "Unknown") if reviewer else "Unknown"
+    db = get_database()
+    
+    user_id = str(current_user["_id"])
+    reviewer_name = current_user.get("name") or "Unknown"
     
     # Create review entry for history
-    review_entry = {
-        "reviewer_id": ObjectId(user_id),
-        "reviewer_name": reviewer_name,
-        "decision": review.decision,
-        "notes": review.verifier_notes or "",
-        "reviewed_at": datetime.utcnow()
-    }
+    review_entry = review_store.build_entry(user_id, reviewer_name, review.decision, review.verifier_notes or "")
     
     # Update document status
     new_status = "verified" if review.decision == "approved" else "rejected"
     if review.decision == "flagged":
         new_status = "flagged"
     
-    await db.documents.update_one(
-        {"_id": ObjectId(document_id)},
+    # One conditional write: only a document still awaiting review (not leased by
+    # another verifier), assigned to this reviewer, or verified by the AI alone.
+    # The pre-update state is returned for the review log.
+    now = datetime.utcnow()
+    document = await db.documents.find_one_and_update(
+        {
+            "_id": ObjectId(document_id),
+            "isDeleted": {"$ne": True},
+            **review_queue.manual_review_filter(ObjectId(user_id), role == "admin", now)
+        },
         {
             "$set": {
                 "verificationStatus": new_status,
-                "updatedAt": datetime.utcnow()
+                "updatedAt": now
             },
-            "$push": {"review_history": review_entry},
+            "$unset": review_queue.release_fields(),
+            "$push": review_store.push_latest(review_entry),
             "$inc": {"verificationCount": 1}
-        }
+        },
+        projection={"fileName": 1, "userId": 1, "verificationStatus": 1}
     )
+    if not document:
+        await review_queue.raise_review_conflict(document_id, MANUAL_REVIEW_STATUSES)
     
-    # Send email notification to document owner
+    await review_store.record(document, review_entry)
+    
+    # Queue email notification to document owner
     try:
         # Import here to avoid circular dependency
         from app.services.email_service import email_service
         
         # Get document owner
-        doc_owner = await db.users.find_one({"_id": document.get("userId")})
+        doc_owner = await db.users.find_one({"_id": document.get("userId")}, {"name": 1, "email": 1})
         
         if doc_owner and doc_owner.get("email"):
             owner_email = doc_owner["email"]
             owner_name = doc_owner.get("name", "User")
             
             # Select email template based on decision
-            if review.decision == "approved":
-                html = email_service.get_document_verified_template(
-                    user_name=owner_name,
-                    document_name=document["fileName"]
-                )
-                subject = "✅ Document Verified - DocShield"
-            elif review.decision == "rejected":
-                html = email_service.get_document_rejected_template(
-                    user_name=owner_name,
-                    document_name=document["fileName"],
-                    reviewer_notes=review.verifier_notes or "No specific reason provided.",
-                    reviewer_name=reviewer_name
-                )
-                subject = "❌ Document Rejected - DocShield"
-            else:  # flagged
-                html = email_service.get_document_flagged_template(
-                    user_name=owner_name,
-                    document_name=document["fileName"],
-                    reviewer_notes=review.verifier_notes or "Document requires additional review.",
-                    reviewer_name=reviewer_name
-                )
-                subject = "⚠️ Document Flagged - DocShield"
+            subject, html = email_service.get_review_decision_email(
+                user_name=owner_name,
+                document_name=document["fileName"],
+                decision=review.decision,
+                reviewer_notes=review.verifier_notes,
+                reviewer_name=reviewer_name
+            )
             
-            # Send email asynchronously (don't block on failure)
-            await email_service.send_email(
+            # The outbox worker sends it, so the review never waits on the mail relay
+            await email_service.enqueue(
                 to=owner_email,
                 subject=subject,
                 html=html
             )
-            print(f"📧 Email notification sent to {owner_email}")
+            print(f"📧 Email notification queued for {owner_email}")
     except Exception as email_error:
         # Log error but don't fail the review
-        print(f"⚠️ Failed to send email notification: {email_error}")
+        print(f"⚠️ Failed to queue email notification: {email_error}")
     
     return {
         "success": True,
@@ -201,7 +211,7 @@ async def manual_review(
             "verifier_name": reviewer_name,
             "decision": review.decision,
             "notes": review.verifier_notes,
-            "reviewed_at": datetime.utcnow().isoformat()
+            "reviewed_at": review_entry["reviewed_at"].isoformat()
         }
     }
 
@@ -209,13 +219,12 @@ async def manual_review(
 async def assign_verifier(
     document_id: str,
     verifier_id: str,
-    user_id: str = Depends(get_current_user_id)
+    current_user: dict = Depends(get_authenticated_user)
 ):
     """Assign a document to a specific verifier (Admin only)"""
     
     # Check if user is admin
-    role = await get_user_role(user_id)
-    if role != 'admin':
+    if current_user.get("role") != 'admin':
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only admins can assign verifiers"
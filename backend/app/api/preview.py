@@ -6,6 +6,7 @@ from datetime import datetime, timedelta
 import secrets
 
 from app.core.security import decode_access_token
+from app.core.auth import get_user_by_email
 from app.database import get_database
 
 router = APIRouter(prefix="/api/preview", tags=["Document Preview"])
@@ -96,7 +97,6 @@ async def generate_preview_token(
         )
     
     email = payload.get("sub")
-    role = payload.get("role", "user")
     
     if not email:
         raise HTTPException(
@@ -105,7 +105,7 @@ async def generate_preview_token(
         )
     
     db = get_database()
-    user = await db.users.find_one({"email": email})
+    user = await get_user_by_email(email)
     
     if not user:
         raise HTTPException(
@@ -114,6 +114,7 @@ async def generate_preview_token(
         )
     
     user_id = str(user["_id"])
+    role = user.get("role", "user")
     
     # Verify document exists and check ownership/role
     document = await db.documents.find_one({"_id": ObjectId(document_id)})
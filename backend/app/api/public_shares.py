@@ -1,27 +1,20 @@
-from fastapi import APIRouter, HTTPException, Query, status
+from fastapi import APIRouter, Header, HTTPException, Query, status
 from typing import Optional
 from bson import ObjectId
-from datetime import datetime
+from datetime import datetime, timedelta
+import calendar
 import bcrypt
 
-from app.schemas.share import PublicShareResponse
+from app.config import settings
+from app.schemas.share import PublicShareResponse, ShareUnlockRequest, ShareUnlockResponse
 from app.database import get_database
+from app.core.security import run_in_password_pool, create_share_access_token, verify_share_access_token
 
 router = APIRouter(prefix="/api/public", tags=["Public"])
 
 
-@router.get("/share/{share_id}", response_model=PublicShareResponse)
-async def get_public_share(
-    share_id: str,
-    password: Optional[str] = Query(None)
-):
-    """
-    Public endpoint to access a shared document
-    No authentication required
-    """
-    db = get_database()
-    
-    # Find the share
+async def get_active_share(db, share_id: str) -> dict:
+    """Find a share that is neither revoked nor expired"""
     share = await db.shares.find_one({
         "share_id": share_id,
         "is_revoked": False
@@ -41,20 +34,75 @@ async def get_public_share(
                 detail="Share link has expired"
             )
     
-    # Check password if protected
-    if share.get("password_hash"):
-        if not password:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Password required"
-            )
-        
-        # Verify password
-        if not bcrypt.checkpw(password.encode('utf-8'), share["password_hash"].encode('utf-8')):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid password"
-            )
+    return share
+
+
+def check_share_access(share: dict, token: Optional[str]):
+    """Require a valid access token from /unlock for password-protected shares"""
+    if not share.get("password_hash"):
+        return
+    
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Password required"
+        )
+    
+    if not verify_share_access_token(token, share["share_id"], share["password_hash"]):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Share access expired, please enter the password again"
+        )
+
+
+@router.post("/share/{share_id}/unlock", response_model=ShareUnlockResponse)
+async def unlock_share(share_id: str, request: ShareUnlockRequest):
+    """
+    Verify a share password once and return a short-lived access token
+    Send it as the X-Share-Token header, or the token query parameter for download links
+    """
+    db = get_database()
+    share = await get_active_share(db, share_id)
+    
+    if not share.get("password_hash"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Share is not password protected"
+        )
+    
+    if not await run_in_password_pool(bcrypt.checkpw, request.password.encode('utf-8'), share["password_hash"].encode('utf-8')):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid password"
+        )
+    
+    # Never outlive the share itself
+    expires_at = datetime.utcnow() + timedelta(minutes=settings.SHARE_UNLOCK_TTL_MINUTES)
+    if share.get("expires_at"):
+        expires_at = min(expires_at, share["expires_at"])
+    
+    access_token = create_share_access_token(
+        share_id,
+        share["password_hash"],
+        calendar.timegm(expires_at.utctimetuple())
+    )
+    
+    return ShareUnlockResponse(access_token=access_token, expires_at=expires_at)
+
+
+@router.get("/share/{share_id}", response_model=PublicShareResponse)
+async def get_public_share(
+    share_id: str,
+    token: Optional[str] = Query(None),
+    x_share_token: Optional[str] = Header(None)
+):
+    """
+    Public endpoint to access a shared document
+    No authentication required
+    """
+    db = get_database()
+    share = await get_active_share(db, share_id)
+    check_share_access(share, x_share_token or token)
     
     # Get document details
     document = await db.documents.find_one({"_id": share["document_id"]})
@@ -82,6 +130,8 @@ async def get_public_share(
     download_url = None
     if share["allow_download"]:
         download_url = f"/api/public/share/{share_id}/download"
+        if share.get("password_hash"):
+            download_url += f"?token={x_share_token or token}"
     
     return PublicShareResponse(
         document_id=str(document["_id"]),
@@ -98,7 +148,8 @@ async def get_public_share(
 @router.get("/share/{share_id}/download")
 async def download_shared_document(
     share_id: str,
-    password: Optional[str] = Query(None)
+    token: Optional[str] = Query(None),
+    x_share_token: Optional[str] = Header(None)
 ):
     """
     Download a shared document
@@ -107,40 +158,8 @@ async def download_shared_document(
     from fastapi.responses import FileResponse
     
     db = get_database()
-    
-    # Find the share
-    share = await db.shares.find_one({
-        "share_id": share_id,
-        "is_revoked": False
-    })
-    
-    if not share:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Share not found or has been revoked"
-        )
-    
-    # Check expiration
-    if share.get("expires_at"):
-        if datetime.utcnow() > share["expires_at"]:
-            raise HTTPException(
-                status_code=status.HTTP_410_GONE,
-                detail="Share link has expired"
-            )
-    
-    # Check password if protected
-    if share.get("password_hash"):
-        if not password:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Password required"
-            )
-        
-        if not bcrypt.checkpw(password.encode('utf-8'), share["password_hash"].encode('utf-8')):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid password"
-            )
+    share = await get_active_share(db, share_id)
+    check_share_access(share, x_share_token or token)
     
     # Check download permission
     if not share.get("allow_download", True):
@@ -1,5 +1,4 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import List, Optional
 from bson import ObjectId
 from datetime import datetime, timedelta
@@ -8,11 +7,11 @@ import string
 import bcrypt
 
 from app.schemas.share import ShareCreate, ShareResponse, PublicShareResponse
-from app.core.security import decode_access_token
+from app.core.auth import get_current_user_id
+from app.core.security import run_in_password_pool
 from app.database import get_database
 
 router = APIRouter(prefix="/api/shares", tags=["Shares"])
-security = HTTPBearer()
 
 
 def generate_share_id(length: int = 8) -> str:
@@ -37,57 +36,6 @@ def calculate_expiration(expires_in: str) -> Optional[datetime]:
         raise ValueError(f"Invalid expires_in value: {expires_in}")
 
 
-async def get_current_user_id(credentials: HTTPAuthorizationCredentials = Depends(security)) -> str:
-    """Get current user ID from JWT token"""
-    token = credentials.credentials
-    payload = decode_access_token(token)
-    
-    if payload is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials"
-        )
-    
-    email = payload.get("sub")
-    if email is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials"
-        )
-    
-    db = get_database()
-    user = await db.users.find_one({"email": email})
-    
-    if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found"
-        )
-    
-    # Check if password was changed after token was issued
-    token_pwd_changed_at = payload.get("pwd_changed_at")
-    user_pwd_changed_at = user.get("password_changed_at")
-    
-    if user_pwd_changed_at:
-        from datetime import datetime
-        user_pwd_time = user_pwd_changed_at.isoformat() if isinstance(user_pwd_changed_at, datetime) else str(user_pwd_changed_at)
-        
-        if token_pwd_changed_at != user_pwd_time:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Session expired due to password change. Please login again."
-            )
-    
-    # Check if user is banned
-    if user.get("banned", False):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Account has been suspended"
-        )
-    
-    return str(user["_id"])
-
-
 @router.post("", response_model=ShareResponse)
 async def create_share(
     share_data: ShareCreate,
@@ -119,10 +67,11 @@ async def create_share(
     # Hash password if provided
     password_hash = None
     if share_data.password:
-        password_hash = bcrypt.hashpw(
+        password_hash = (await run_in_password_pool(
+            bcrypt.hashpw,
             share_data.password.encode('utf-8'),
             bcrypt.gensalt()
-        ).decode('utf-8')
+        )).decode('utf-8')
     
     # Create share document
     share = {
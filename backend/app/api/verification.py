@@ -1,60 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from bson import ObjectId
 from datetime import datetime
+from pymongo import ReturnDocument
 import time
 
 from app.schemas.verification import AIAnalysisRequest, AIAnalysisResult, VerificationRequest, VerificationResponse
-from app.core.security import decode_access_token
+from app.core.auth import get_current_user_id
 from app.database import get_database
+from app.core.review_priority import review_fields
 from app.services.document_analyzer import document_analyzer
 
 router = APIRouter(prefix="/api/verification", tags=["Verification"])
-security = HTTPBearer()
-
-async def get_current_user_id(credentials: HTTPAuthorizationCredentials = Depends(security)) -> str:
-    """Get current user ID from JWT token"""
-    token = credentials.credentials
-    payload = decode_access_token(token)
-    
-    if payload is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials"
-        )
-    
-    email = payload.get("sub")
-    db = get_database()
-    user = await db.users.find_one({"email": email})
-    
-    if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found"
-        )
-    
-    # Check if password was changed after token was issued
-    token_pwd_changed_at = payload.get("pwd_changed_at")
-    user_pwd_changed_at = user.get("password_changed_at")
-    
-    if user_pwd_changed_at:
-        from datetime import datetime
-        user_pwd_time = user_pwd_changed_at.isoformat() if isinstance(user_pwd_changed_at, datetime) else str(user_pwd_changed_at)
-        
-        if token_pwd_changed_at != user_pwd_time:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Session expired due to password change. Please login again."
-            )
-    
-    # Check if user is banned
-    if user.get("banned", False):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Account has been suspended"
-        )
-    
-    return str(user["_id"])
 
 @router.post("/analyze")
 async def analyze_document(
@@ -117,6 +73,7 @@ async def analyze_document(
         {
             "$set": {
                 "aiAnalysis": analysis,
+                **review_fields(analysis, document["createdAt"]),
                 "verificationStatus": "analyzed",
                 "updatedAt": datetime.utcnow()
             }
@@ -125,7 +82,7 @@ async def analyze_document(
     
     return {
         "success": True,
-        "message": "Document analyzed successfully",
+        "message": "Provisional analysis saved, AI analysis will be retried" if analysis.get("provisional") else "Document analyzed successfully",
         "analysis": analysis,
         "cached": False
     }
@@ -139,10 +96,14 @@ async def request_verification(
     db = get_database()
     
     # Get document
-    document = await db.documents.find_one({
-        "_id": ObjectId(request.document_id),
-        "userId": ObjectId(user_id)
-    })
+    document = await db.documents.find_one(
+        {
+            "_id": ObjectId(request.document_id),
+            "userId": ObjectId(user_id)
+        },
+        {"aiAnalysis": 1, "extractedText": 1, "fileName": 1, "fileType": 1,
+         "metadata.category": 1, "verificationStatus": 1, "createdAt": 1}
+    )
     
     if not document:
         raise HTTPException(
@@ -150,8 +111,11 @@ async def request_verification(
             detail="Document not found"
         )
     
+    update = {"updatedAt": datetime.utcnow()}
+    analysis = document.get("aiAnalysis")
+    
     # Auto-analyze if not already analyzed
-    if not document.get("aiAnalysis"):
+    if not analysis:
         # Trigger analysis
         extracted_text = document.get("extractedText", "")
         if extracted_text:
@@ -164,27 +128,34 @@ async def request_verification(
             )
             analysis["processingTime"] = time.time() - start_time
             analysis["analyzedAt"] = datetime.utcnow()
-            
-            # Save analysis
-            await db.documents.update_one(
-                {"_id": ObjectId(request.document_id)},
-                {"$set": {"aiAnalysis": analysis}}
-            )
+            update.update({"aiAnalysis": analysis, **review_fields(analysis, document["createdAt"])})
     
-    # Update verification status
-    await db.documents.update_one(
-        {"_id": ObjectId(request.document_id)},
+    # Verification status follows the analysis saved with it
+    update["verificationStatus"] = "verified" if (
+        (analysis or {}).get("authenticityScore", 0) > 70
+        and not (analysis or {}).get("provisional")
+    ) else "pending_review"
+    
+    # Save analysis and status in one write, only if nobody changed the status
+    # while the analysis ran (e.g. a verifier reviewed the document)
+    updated_doc = await db.documents.find_one_and_update(
         {
-            "$set": {
-                "verificationStatus": "verified" if document.get("aiAnalysis", {}).get("authenticityScore", 0) > 70 else "pending_review",
-                "verificationCount": document.get("verificationCount", 0) + 1,
-                "updatedAt": datetime.utcnow()
-            }
-        }
+            "_id": document["_id"],
+            "verificationStatus": document.get("verificationStatus")
+        },
+        {
+            "$set": update,
+            "$inc": {"verificationCount": 1}
+        },
+        projection={"verificationStatus": 1, "createdAt": 1, "aiAnalysis": 1},
+        return_document=ReturnDocument.AFTER
     )
     
-    # Get updated document
-    updated_doc = await db.documents.find_one({"_id": ObjectId(request.document_id)})
+    if not updated_doc:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Document status changed while verification was requested, please retry"
+        )
     
     return VerificationResponse(
         id=str(updated_doc["_id"]),
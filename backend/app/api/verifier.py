@@ -1,78 +1,53 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import Optional, List
 from bson import ObjectId
 from datetime import datetime, timedelta
+from pymongo import UpdateOne
+import re
 
-from app.core.security import decode_access_token
-from app.database import get_database
+from app.core.auth import get_current_verifier
+from app.core.pagination import keyset_sort, apply_cursor, next_cursor
+from app.core.fields import parse_fields, projection_for, pick
+from app.database import get_database, find_users_by_ids
+from app.schemas.verification_model import BulkReviewRequest
+from app.services.email_service import email_service
+from app.services.review_queue import review_queue, QUEUE_STATUSES
+from app.services.review_store import review_store
 
 router = APIRouter(prefix="/api/verifier", tags=["Verifier"])
-security = HTTPBearer()
 
+# Document status after each review decision
+DECISION_STATUS = {"approved": "verified", "rejected": "rejected", "flagged": "flagged"}
 
-async def get_current_user_with_role(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    """Get current user and verify verifier/admin role"""
-    token = credentials.credentials
-    payload = decode_access_token(token)
-    
-    if payload is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials"
-        )
-    
-    email = payload.get("sub")
-    if email is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials"
-        )
-    
-    db = get_database()
-    user = await db.users.find_one({"email": email})
-    
-    if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found"
-        )
-    
-    # Check if password was changed after token was issued
-    token_pwd_changed_at = payload.get("pwd_changed_at")
-    user_pwd_changed_at = user.get("password_changed_at")
-    
-    if user_pwd_changed_at:
-        from datetime import datetime
-        user_pwd_time = user_pwd_changed_at.isoformat() if isinstance(user_pwd_changed_at, datetime) else str(user_pwd_changed_at)
-        
-        if token_pwd_changed_at != user_pwd_time:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Session expired due to password change. Please login again."
-            )
-    
-    # Check if user is banned
-    if user.get("banned", False):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Account has been suspended"
-        )
-    
-    # Check role
-    role = user.get("role", "user")
-    if role not in ["verifier", "admin"]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Verifier or admin role required"
-        )
-    
-    return {
-        "id": str(user["_id"]),
-        "email": user["email"],
-        "name": user.get("name", "Unknown"),
-        "role": role
-    }
+# Response fields of the listings and the stored fields they are built from
+DOCUMENT_FIELDS = {
+    "id": ["_id"],
+    "fileName": ["fileName"],
+    "fileSize": ["fileSize"],
+    "fileType": ["fileType"],
+    "category": ["metadata.category"],
+    "uploadedAt": ["createdAt"],
+    "verificationStatus": ["verificationStatus"],
+    "fileHash": ["fileHash"],
+    "userId": ["userId"],
+    "userName": ["userId"],
+    "isDeleted": ["isDeleted"],
+    "reviewHistory": ["review_history"]
+}
+
+QUEUE_FIELDS = {
+    "id": ["_id"],
+    "file_name": ["fileName"],
+    "file_size": ["fileSize"],
+    "file_type": ["fileType"],
+    "verification_status": ["verificationStatus"],
+    "uploaded_at": ["createdAt"],
+    "reviewHistory": ["review_history"],
+    "user": ["userId"],
+    "waiting_time": ["createdAt"],
+    "review_priority": ["reviewPriority"],
+    "lease": ["leasedBy", "leasedByName", "leaseExpiresAt"]
+}
 
 
 @router.get("/documents")
@@ -85,7 +60,9 @@ async def get_all_documents(
     sort_order: str = "desc",
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
-    current_user: dict = Depends(get_current_user_with_role)
+    cursor: Optional[str] = Query(None, description="Opaque nextCursor from the previous page; takes precedence over page"),
+    fields: Optional[str] = Query(None, description="Comma-separated response fields (default: all)"),
+    current_user: dict = Depends(get_current_verifier)
 ):
     """Get all documents in the system (verifier access)"""
     db = get_database()
@@ -107,8 +84,8 @@ async def get_all_documents(
     if search:
         search_condition = {
             "$or": [
-                {"fileName": {"$regex": search, "$options": "i"}},
-                {"category": {"$regex": search, "$options": "i"}}
+                {"fileName": {"$regex": re.escape(search), "$options": "i"}},
+                {"metadata.category": {"$regex": re.escape(search), "$options": "i"}}
             ]
         }
         if "$and" in query:
@@ -131,24 +108,44 @@ async def get_all_documents(
             start = None
         
         if start:
-            query["uploadedAt"] = {"$gte": start}
+            query["createdAt"] = {"$gte": start}
     
-    # Get total count
-    total = await db.documents.count_documents(query)
+    # Get total count. Unfiltered, that is every document: take the collection's
+    # metadata count and subtract soft-deleted ones (deleted_at index) instead
+    if search or "verificationStatus" in query or "createdAt" in query:
+        total = await db.documents.count_documents(query)
+    else:
+        total = await db.documents.estimated_document_count()
+        if not show_deleted:
+            total -= await db.documents.count_documents({
+                "isDeleted": True,
+                "deletedAt": {"$lte": datetime.utcnow()}
+            })
     
     # Sort options
     sort_direction = -1 if sort_order == "desc" else 1
-    sort_field = sort_by if sort_by in ["uploadedAt", "fileName", "fileSize"] else "uploadedAt"
+    # Documents store their upload time as createdAt
+    sort_fields = {"uploadedAt": "createdAt", "fileName": "fileName", "fileSize": "fileSize"}
+    sort_field = sort_fields.get(sort_by, "createdAt")
+    
+    sort = keyset_sort(sort_field, sort_direction)
+    
+    selected = parse_fields(fields, DOCUMENT_FIELDS)
+    projection = projection_for(DOCUMENT_FIELDS, selected, always=[sort_field])
     
     # Get documents
-    skip = (page - 1) * limit
-    docs = await db.documents.find(query).sort(sort_field, sort_direction).skip(skip).limit(limit).to_list(length=limit)
+    skip = 0 if cursor else (page - 1) * limit
+    docs = await db.documents.find(apply_cursor(query, sort, cursor), projection).sort(sort).skip(skip).limit(limit).to_list(length=limit)
+    
+    # Owners for the whole page in one query
+    owners = {}
+    if "userName" in selected:
+        owners = await find_users_by_ids([doc.get("userId") for doc in docs], {"name": 1})
     
     # Serialize documents
     result = []
     for doc in docs:
-        # Get user info
-        user = await db.users.find_one({"_id": ObjectId(doc.get("userId"))}) if doc.get("userId") else None
+        user = owners.get(str(doc.get("userId")))
         
         # Serialize review history
         review_history = []
@@ -161,32 +158,37 @@ async def get_all_documents(
                 "reviewed_at": review["reviewed_at"].isoformat() if "reviewed_at" in review else ""
             })
         
-        result.append({
+        result.append(pick({
             "id": str(doc["_id"]),
             "fileName": doc.get("fileName", "Unknown"),
             "fileSize": doc.get("fileSize", 0),
             "fileType": doc.get("fileType", "unknown"),
-            "category": doc.get("category", "uncategorized"),
-            "uploadedAt": doc["uploadedAt"].isoformat() if "uploadedAt" in doc else datetime.utcnow().isoformat(),
+            "category": doc.get("metadata", {}).get("category", "uncategorized"),
+            "uploadedAt": doc["createdAt"].isoformat() if "createdAt" in doc else datetime.utcnow().isoformat(),
             "verificationStatus": doc.get("verificationStatus", "pending"),
             "fileHash": doc.get("fileHash", ""),
             "userId": str(doc["userId"]) if doc.get("userId") else "",
             "userName": user.get("name", "Unknown") if user else "Unknown",
             "isDeleted": doc.get("isDeleted", False),
             "reviewHistory": review_history
-        })
+        }, selected))
     
     return {
         "documents": result,
         "total": total,
         "page": page,
-        "totalPages": (total + limit - 1) // limit
+        "totalPages": (total + limit - 1) // limit,
+        "nextCursor": next_cursor(docs, sort, limit)
     }
 
 
 @router.get("/stats")
-async def get_verifier_stats(current_user: dict = Depends(get_current_user_with_role)):
+async def get_verifier_stats(current_user: dict = Depends(get_current_verifier)):
     """Get verifier statistics"""
+    cached = review_store.stats_cache.get(current_user["id"])
+    if cached is not None:
+        return cached
+    
     db = get_database()
     
     # Count pending documents (pending + flagged) - exclude deleted
@@ -195,56 +197,63 @@ async def get_verifier_stats(current_user: dict = Depends(get_current_user_with_
         "$or": [{"isDeleted": {"$exists": False}}, {"isDeleted": False}]
     })
     
-    # Get user's review history
-    verifier_id = ObjectId(current_user["id"])
-    
-    # Count reviews today
+    # Today, this week, total and approvals from the verifier's review rollups
     today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-    reviewed_today = await db.documents.count_documents({
-        "review_history.reviewer_id": verifier_id,
-        "review_history.reviewed_at": {"$gte": today_start}
-    })
-    
-    # Count reviews this week
     week_start = today_start - timedelta(days=today_start.weekday())
-    reviewed_this_week = await db.documents.count_documents({
-        "review_history.reviewer_id": verifier_id,
-        "review_history.reviewed_at": {"$gte": week_start}
-    })
-    
-    # Count total reviews
-    reviewed_total = await db.documents.count_documents({
-        "review_history.reviewer_id": verifier_id
-    })
-    
-    # Calculate approval rate
-    approved_count = await db.documents.count_documents({
-        "review_history": {
-            "$elemMatch": {
-                "reviewer_id": verifier_id,
-                "decision": "approved"
-            }
-        }
-    })
+    counts = await review_store.reviewer_counts(ObjectId(current_user["id"]), today_start, week_start)
     
-    approval_rate = (approved_count / reviewed_total * 100) if reviewed_total > 0 else 0
+    reviewed_total = counts["total"]
+    approval_rate = (counts["approved"] / reviewed_total * 100) if reviewed_total > 0 else 0
     
-    return {
+    stats = {
         "pending_count": pending_count,
-        "reviewed_today": reviewed_today,
-        "reviewed_this_week": reviewed_this_week,
+        "reviewed_today": counts["today"],
+        "reviewed_this_week": counts["week"],
         "reviewed_total": reviewed_total,
         "approval_rate": round(approval_rate, 1)
     }
+    review_store.stats_cache.set(current_user["id"], stats)
+    return stats
+
+
+def queue_statuses(status_filter: str) -> dict:
+    """verificationStatus filter of the review queue"""
+    if status_filter == "all":
+        return {"$in": QUEUE_STATUSES}
+    return {"$in": [status_filter]}
+
+
+def queue_sort(sort_by: str) -> list:
+    """Keyset sort of the review queue"""
+    if sort_by == "priority":
+        # Risk-boosted upload time, see app.core.review_priority.queue_rank.
+        # Only flagged documents carry a risk score: pending ones have not been
+        # analyzed yet, so they rank by upload time (oldest first)
+        return keyset_sort("queueRank", 1)
+    return keyset_sort("createdAt", 1 if sort_by == "oldest" else -1)
+
+
+def serialize_lease(doc: dict, now: datetime) -> Optional[dict]:
+    """Who is reviewing a queue document, if their lease is still live"""
+    expires_at = doc.get("leaseExpiresAt")
+    if not expires_at or expires_at <= now:
+        return None
+    return {
+        "verifier_id": str(doc.get("leasedBy")),
+        "verifier_name": doc.get("leasedByName", "Unknown"),
+        "expires_at": expires_at.isoformat()
+    }
 
 
 @router.get("/queue")
 async def get_review_queue(
     status_filter: Optional[str] = Query("all", regex="^(all|pending|flagged)$"),
-    sort_by: Optional[str] = Query("oldest", regex="^(oldest|newest)$"),
+    sort_by: Optional[str] = Query("oldest", regex="^(oldest|newest|priority)$"),
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=50),
-    current_user: dict = Depends(get_current_user_with_role)
+    cursor: Optional[str] = Query(None, description="Opaque nextCursor from the previous page; takes precedence over page"),
+    fields: Optional[str] = Query(None, description="Comma-separated response fields (default: all)"),
+    current_user: dict = Depends(get_current_verifier)
 ):
     """Get pending documents queue for review"""
     db = get_database()
@@ -252,31 +261,32 @@ async def get_review_queue(
     # Build query - exclude deleted documents
     query = {"$or": [{"isDeleted": {"$exists": False}}, {"isDeleted": False}]}
     
-    if status_filter == "all":
-        query["verificationStatus"] = {"$in": ["pending", "flagged"]}
-    else:
-        query["verificationStatus"] = status_filter
+    query["verificationStatus"] = queue_statuses(status_filter)
+    sort = queue_sort(sort_by)
     
-    # Sort
-    sort_direction = 1 if sort_by == "oldest" else -1
+    selected = parse_fields(fields, QUEUE_FIELDS)
+    projection = projection_for(QUEUE_FIELDS, selected, always=["createdAt", *(field for field, _ in sort)])
     
     # Get documents with pagination
-    skip = (page - 1) * limit
-    cursor = db.documents.find(query).sort("createdAt", sort_direction).skip(skip).limit(limit)
-    docs = await cursor.to_list(length=limit)
+    skip = 0 if cursor else (page - 1) * limit
+    docs = await db.documents.find(apply_cursor(query, sort, cursor), projection).sort(sort).skip(skip).limit(limit).to_list(length=limit)
     
     # Get total count
     total = await db.documents.count_documents(query)
     
-    # Enrich with user info
+    # Enrich with user info, fetched for the whole page in one query
+    owners = {}
+    if "user" in selected:
+        owners = await find_users_by_ids([doc.get("userId") for doc in docs], {"name": 1, "email": 1})
+    
+    now = datetime.utcnow()
     result_docs = []
     for doc in docs:
-        # Get user info
-        user = await db.users.find_one({"_id": doc["userId"]})
+        user = owners.get(str(doc.get("userId")))
         
         # Calculate waiting time
         upload_time = doc["createdAt"]
-        waiting_time = datetime.utcnow() - upload_time
+        waiting_time = now - upload_time
         
         if waiting_time.days > 0:
             waiting_str = f"{waiting_time.days} days"
@@ -300,12 +310,12 @@ async def get_review_queue(
                     "reviewed_at": review.get("reviewed_at").isoformat() if review.get("reviewed_at") else None
                 })
         
-        result_docs.append({
+        result_docs.append(pick({
             "id": str(doc["_id"]),
-            "file_name": doc["fileName"],
-            "file_size": doc["fileSize"],
-            "file_type": doc["fileType"],
-            "verification_status": doc["verificationStatus"],
+            "file_name": doc.get("fileName"),
+            "file_size": doc.get("fileSize"),
+            "file_type": doc.get("fileType"),
+            "verification_status": doc.get("verificationStatus"),
             "uploaded_at": doc["createdAt"].isoformat(),
             "reviewHistory": serialized_reviews,  # Add review history
             "user": {
@@ -313,66 +323,122 @@ async def get_review_queue(
                 "name": user.get("name", "Unknown") if user else "Unknown",
                 "email": user.get("email", "") if user else ""
             },
-            "waiting_time": waiting_str
-        })
+            "waiting_time": waiting_str,
+            "review_priority": doc.get("reviewPriority", 0),
+            "lease": serialize_lease(doc, now)
+        }, selected))
     
     return {
         "documents": result_docs,
         "total": total,
         "page": page,
-        "pages": (total + limit - 1) // limit
+        "pages": (total + limit - 1) // limit,
+        "nextCursor": next_cursor(docs, sort, limit)
     }
 
 
-@router.post("/quick-review/{document_id}")
-async def quick_review(
-    document_id: str,
-    decision: str = Query(..., regex="^(approved|rejected)$"),
-    notes: Optional[str] = None,
-    current_user: dict = Depends(get_current_user_with_role)
+@router.post("/queue/claim")
+async def claim_next_document(
+    status_filter: Optional[str] = Query("all", regex="^(all|pending|flagged)$"),
+    sort_by: Optional[str] = Query("oldest", regex="^(oldest|newest|priority)$"),
+    current_user: dict = Depends(get_current_verifier)
 ):
-    """Quick review action without modal"""
-    db = get_database()
+    """Lease the next queue document so no other verifier picks it up"""
+    doc = await review_queue.claim(current_user, queue_statuses(status_filter)["$in"], queue_sort(sort_by))
     
-    # Get document
-    document = await db.documents.find_one({"_id": ObjectId(document_id)})
+    if not doc:
+        return {"document": None, "lease": None}
     
-    if not document:
+    return {
+        "document": {
+            "id": str(doc["_id"]),
+            "file_name": doc.get("fileName"),
+            "file_size": doc.get("fileSize"),
+            "file_type": doc.get("fileType"),
+            "category": doc.get("metadata", {}).get("category"),
+            "verification_status": doc.get("verificationStatus"),
+            "uploaded_at": doc["createdAt"].isoformat(),
+            "aiAnalysis": doc.get("aiAnalysis"),
+            "review_priority": doc.get("reviewPriority", 0)
+        },
+        "lease": {"expires_at": doc["leaseExpiresAt"].isoformat()}
+    }
+
+
+@router.post("/queue/{document_id}/renew")
+async def renew_lease(
+    document_id: str,
+    current_user: dict = Depends(get_current_verifier)
+):
+    """Extend the lease on a claimed document"""
+    doc = await review_queue.renew(document_id, current_user["id"])
+    
+    if not doc:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Document not found"
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Lease lost: the document was reviewed or claimed by another verifier"
         )
     
-    # Check if already reviewed
-    if document["verificationStatus"] not in ["pending", "flagged"]:
+    return {"success": True, "lease": {"expires_at": doc["leaseExpiresAt"].isoformat()}}
+
+
+@router.delete("/queue/{document_id}/lease")
+async def release_lease(
+    document_id: str,
+    current_user: dict = Depends(get_current_verifier)
+):
+    """Return a claimed document to the queue"""
+    if not await review_queue.release(document_id, current_user["id"]):
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Document already reviewed"
+            status_code=status.HTTP_409_CONFLICT,
+            detail="You do not hold a lease on this document"
         )
     
-    # Update document
-    new_status = "verified" if decision == "approved" else "rejected"
+    return {"success": True}
+
+
+@router.post("/quick-review/{document_id}")
+async def quick_review(
+    document_id: str,
+    decision: str = Query(..., regex="^(approved|rejected)$"),
+    notes: Optional[str] = None,
+    current_user: dict = Depends(get_current_verifier)
+):
+    """Quick review action without modal"""
+    db = get_database()
     
-    review_entry = {
-        "reviewer_id": ObjectId(current_user["id"]),
-        "reviewer_name": current_user["name"],
-        "decision": decision,
-        "notes": notes or f"Quick {decision}",
-        "reviewed_at": datetime.utcnow()
-    }
+    verifier_id = ObjectId(current_user["id"])
+    new_status = "verified" if decision == "approved" else "rejected"
+    review_entry = review_store.build_entry(
+        current_user["id"], current_user["name"], decision, notes or f"Quick {decision}"
+    )
     
-    await db.documents.update_one(
-        {"_id": ObjectId(document_id)},
+    # Review only if still queued and not leased by another verifier; drops our lease
+    now = datetime.utcnow()
+    document = await db.documents.find_one_and_update(
+        {
+            "_id": ObjectId(document_id),
+            "verificationStatus": {"$in": QUEUE_STATUSES},
+            "isDeleted": {"$ne": True},
+            **review_queue.reviewable_by(verifier_id, now)
+        },
         {
             "$set": {
                 "verificationStatus": new_status,
-                "reviewedAt": datetime.utcnow(),
+                "reviewedAt": now,
                 "reviewedBy": current_user["name"]
             },
-            "$push": {"review_history": review_entry}
-        }
+            "$unset": review_queue.release_fields(),
+            "$push": review_store.push_latest(review_entry)
+        },
+        projection={"fileName": 1, "userId": 1, "verificationStatus": 1}
     )
     
+    if not document:
+        await review_queue.raise_review_conflict(document_id, QUEUE_STATUSES)
+    
+    await review_store.record(document, review_entry)
+    
     return {
         "success": True,
         "message": f"Document {decision}",
@@ -380,12 +446,150 @@ async def quick_review(
     }
 
 
+async def notify_owners(reviewed: list, reviewer_name: str):
+    """Queue an email to each owner about the decision on their document"""
+    try:
+        owners = await find_users_by_ids([doc.get("userId") for doc, _ in reviewed], {"name": 1, "email": 1})
+        messages = []
+        for doc, entry in reviewed:
+            owner = owners.get(str(doc.get("userId")))
+            if not owner or not owner.get("email"):
+                continue
+            subject, html = email_service.get_review_decision_email(
+                user_name=owner.get("name", "User"),
+                document_name=doc.get("fileName", "document"),
+                decision=entry["decision"],
+                reviewer_notes=entry["notes"],
+                reviewer_name=reviewer_name
+            )
+            messages.append({"to": owner["email"], "subject": subject, "html": html})
+        await email_service.enqueue_many(messages)
+        print(f"📧 Bulk review notifications: {len(messages)} queued")
+    except Exception as e:
+        print(f"⚠️ Failed to queue bulk review notifications: {e}")
+
+
+@router.post("/bulk-review")
+async def bulk_review(
+    request: BulkReviewRequest,
+    current_user: dict = Depends(get_current_verifier)
+):
+    """Review many queue documents in one write; owner emails go through the outbox"""
+    db = get_database()
+    
+    ids = []
+    for item in request.reviews:
+        if not ObjectId.is_valid(item.document_id):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid document id: {item.document_id}"
+            )
+        ids.append(ObjectId(item.document_id))
+    if len(set(ids)) != len(ids):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Each document can only be reviewed once per request"
+        )
+    
+    verifier_id = ObjectId(current_user["id"])
+    now = datetime.utcnow()
+    
+    # One read to tell which documents can be reviewed and why the others cannot
+    documents = await db.documents.find(
+        {"_id": {"$in": ids}},
+        {"fileName": 1, "userId": 1, "verificationStatus": 1, "isDeleted": 1,
+         "leasedBy": 1, "leasedByName": 1, "leaseExpiresAt": 1}
+    ).to_list(length=len(ids))
+    by_id = {doc["_id"]: doc for doc in documents}
+    
+    skipped = []
+    candidates = []
+    for item, document_id in zip(request.reviews, ids):
+        doc = by_id.get(document_id)
+        lease_expires = doc.get("leaseExpiresAt") if doc else None
+        if not doc or doc.get("isDeleted"):
+            skipped.append({"document_id": item.document_id, "reason": "Document not found"})
+        elif doc.get("verificationStatus") not in QUEUE_STATUSES:
+            skipped.append({"document_id": item.document_id, "reason": "Document already reviewed"})
+        elif lease_expires and lease_expires > now and doc.get("leasedBy") != verifier_id:
+            skipped.append({
+                "document_id": item.document_id,
+                "reason": f"Document is being reviewed by {doc.get('leasedByName', 'another verifier')}"
+            })
+        else:
+            entry = review_store.build_entry(
+                current_user["id"], current_user["name"], item.decision,
+                item.notes or f"Bulk {item.decision}", reviewed_at=now
+            )
+            candidates.append((doc, entry))
+    
+    # Same preconditions as quick review, re-checked by the server for every document
+    if candidates:
+        result = await db.documents.bulk_write([
+            UpdateOne(
+                {
+                    "_id": doc["_id"],
+                    "verificationStatus": {"$in": QUEUE_STATUSES},
+                    "isDeleted": {"$ne": True},
+                    **review_queue.reviewable_by(verifier_id, now)
+                },
+                {
+                    "$set": {
+                        "verificationStatus": DECISION_STATUS[entry["decision"]],
+                        "reviewedAt": now,
+                        "reviewedBy": current_user["name"],
+                        "updatedAt": now
+                    },
+                    "$unset": review_queue.release_fields(),
+                    "$push": review_store.push_latest(entry),
+                    "$inc": {"verificationCount": 1}
+                }
+            )
+            for doc, entry in candidates
+        ], ordered=False)
+        
+        reviewed = candidates
+        if result.modified_count < len(candidates):
+            # Someone else got to a few first; keep the ones carrying this batch's entry
+            applied = await db.documents.distinct("_id", {
+                "_id": {"$in": [doc["_id"] for doc, _ in candidates]},
+                "review_history": {"$elemMatch": {"reviewer_id": verifier_id, "reviewed_at": now}}
+            })
+            applied = set(applied)
+            reviewed = [(doc, entry) for doc, entry in candidates if doc["_id"] in applied]
+            skipped += [
+                {"document_id": str(doc["_id"]), "reason": "Document changed during review"}
+                for doc, _ in candidates if doc["_id"] not in applied
+            ]
+    else:
+        reviewed = []
+    
+    await review_store.record_many(reviewed)
+    
+    if reviewed:
+        await notify_owners(reviewed, current_user["name"])
+    
+    return {
+        "success": True,
+        "reviewed": [
+            {
+                "document_id": str(doc["_id"]),
+                "decision": entry["decision"],
+                "new_status": DECISION_STATUS[entry["decision"]]
+            }
+            for doc, entry in reviewed
+        ],
+        "skipped": skipped
+    }
+
+
 @router.get("/history")
 async def get_review_history(
-    decision: Optional[str] = Query("all", regex="^(all|approved|rejected)$"),
+    decision: Optional[str] = Query("all", regex="^(all|approved|rejected|flagged)$"),
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
-    current_user: dict = Depends(get_current_user_with_role)
+    cursor: Optional[str] = Query(None, description="Opaque nextCursor from the previous page; takes precedence over page"),
+    current_user: dict = Depends(get_current_verifier)
 ):
     """Get review history for current verifier"""
     db = get_database()
@@ -393,34 +597,67 @@ async def get_review_history(
     verifier_id = ObjectId(current_user["id"])
     
     # Build query
-    query = {"review_history.reviewer_id": verifier_id}
+    query = {"reviewer_id": verifier_id}
+    if decision != "all":
+        query["decision"] = decision
     
-    # Get documents
-    skip = (page - 1) * limit
-    docs = await db.documents.find(query).sort("review_history.reviewed_at", -1).skip(skip).limit(limit).to_list(length=limit)
+    # Newest first; filter, sort and count are all covered by the reviewer indexes
+    sort = keyset_sort("reviewed_at", -1)
+    skip = 0 if cursor else (page - 1) * limit
+    reviews = await db.reviews.find(apply_cursor(query, sort, cursor)).sort(sort).skip(skip).limit(limit).to_list(length=limit)
     
-    # Filter by decision and format
-    result = []
-    for doc in docs:
-        # Find this verifier's review
-        review = next(
-            (r for r in doc.get("review_history", []) if r["reviewer_id"] == verifier_id),
-            None
-        )
-        
-        if review and (decision == "all" or review["decision"] == decision):
-            result.append({
-                "document_id": str(doc["_id"]),
-                "file_name": doc["fileName"],
-                "decision": review["decision"],
-                "notes": review.get("notes", ""),
-                "reviewed_at": review["reviewed_at"].isoformat()
-            })
+    result = [
+        {
+            "document_id": str(review["document_id"]),
+            "file_name": review.get("document_name", "document"),
+            "decision": review["decision"],
+            "notes": review.get("notes", ""),
+            "reviewed_at": review["reviewed_at"].isoformat()
+        }
+        for review in reviews
+    ]
     
-    total = len(result)
+    total = await db.reviews.count_documents(query)
     
     return {
         "reviews": result,
         "total": total,
-        "page": page
+        "page": page,
+        "pages": (total + limit - 1) // limit,
+        "nextCursor": next_cursor(reviews, sort, limit)
+    }
+
+
+@router.get("/documents/{document_id}/reviews")
+async def get_document_reviews(
+    document_id: str,
+    page: int = Query(1, ge=1),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque nextCursor from the previous page; takes precedence over page"),
+    current_user: dict = Depends(get_current_verifier)
+):
+    """Full review history of a document (documents only embed the latest few)"""
+    db = get_database()
+    
+    query = {"document_id": ObjectId(document_id)}
+    sort = keyset_sort("reviewed_at", -1)
+    skip = 0 if cursor else (page - 1) * limit
+    reviews = await db.reviews.find(apply_cursor(query, sort, cursor)).sort(sort).skip(skip).limit(limit).to_list(length=limit)
+    total = await db.reviews.count_documents(query)
+    
+    return {
+        "reviews": [
+            {
+                "reviewer_id": str(review["reviewer_id"]),
+                "reviewer_name": review.get("reviewer_name", "Unknown"),
+                "decision": review["decision"],
+                "notes": review.get("notes", ""),
+                "reviewed_at": review["reviewed_at"].isoformat()
+            }
+            for review in reviews
+        ],
+        "total": total,
+        "page": page,
+        "pages": (total + limit - 1) // limit,
+        "nextCursor": next_cursor(reviews, sort, limit)
     }
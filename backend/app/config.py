@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Optional
 
 class Settings(BaseSettings):
     # MongoDB
@@ -9,10 +9,54 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    AUTH_USER_CACHE_TTL_SECONDS: float = 30.0  # In-process cache of authenticated users
+    TOKEN_CACHE_SIZE: int = 10000  # Verified JWT payloads kept in memory
+    PASSWORD_HASH_WORKERS: int = 4  # Threads for bcrypt hashing/verification
+    PASSWORD_HASH_MAX_PENDING: int = 64  # Queued bcrypt calls before returning 503
+    SHARE_UNLOCK_TTL_MINUTES: int = 15  # Lifetime of a share access token after password entry
     
     # Groq AI
     GROQ_API_KEY: str
     GROQ_MODEL: str = "llama-3.3-70b-versatile"
+    GROQ_TIMEOUT_SECONDS: float = 15.0
+    GROQ_MAX_RETRIES: int = 2
+    GROQ_RETRY_BASE_DELAY: float = 0.5
+    GROQ_BREAKER_FAILURE_THRESHOLD: int = 5
+    GROQ_BREAKER_RESET_SECONDS: float = 30.0
+    ANALYSIS_RETRY_INTERVAL_MINUTES: int = 10
+    GROQ_BASE_URL: Optional[str] = None  # e.g. http://localhost:8090 for the stub server
+    GROQ_MODE: str = "live"  # live, record or replay
+    GROQ_CASSETTE_DIR: str = "./groq_cassettes"
+    GROQ_REPLAY_REALTIME: bool = False  # Replay streams with their recorded chunk timing
+    
+    # AI chat
+    CHAT_MAX_CONCURRENT_PER_USER: int = 2
+    CHAT_STREAM_TIMEOUT_SECONDS: float = 60.0
+    CHAT_MEMORY_RECENT_TURNS: int = 8  # Turns sent verbatim, older ones are summarized
+    CHAT_MEMORY_TOKEN_BUDGET: int = 3000  # Prompt budget for system + summary + history
+    CHAT_SUMMARY_MAX_TOKENS: int = 300
+    CHAT_SESSION_TTL_DAYS: int = 30  # Idle chat sessions are deleted by a TTL index
+    CHAT_RETRIEVAL_TOP_K: int = 4  # Document passages added to the prompt
+    RETRIEVAL_MAX_USERS: int = 500  # Per-user indexes kept in memory
+    
+    # Reviews
+    REVIEW_HISTORY_CACHE_SIZE: int = 5  # Latest reviews embedded in each document
+    VERIFIER_STATS_CACHE_SECONDS: float = 5.0  # Per-verifier dashboard stats kept in memory
+    REVIEW_LEASE_MINUTES: int = 10  # How long a claimed queue document is reserved for its verifier
+    REVIEW_QUEUE_RISK_BOOST_HOURS: float = 24.0  # Priority queue head start per 100 risk points
+    
+    # Admin dashboard
+    ADMIN_STATS_REFRESH_SECONDS: int = 60  # Background recount of system statistics
+    ADMIN_STATS_MAX_AGE_SECONDS: int = 300  # Older snapshots are recomputed on request
+    
+    # Email
+    EMAIL_TIMEOUT_SECONDS: float = 10.0  # Per request to the Next.js mail relay
+    EMAIL_MAX_CONNECTIONS: int = 10  # Pooled connections to the mail relay
+    EMAIL_OUTBOX_POLL_SECONDS: int = 5  # How often the outbox worker looks for due messages
+    EMAIL_OUTBOX_BATCH_SIZE: int = 20  # Messages sent concurrently per poll
+    EMAIL_MAX_ATTEMPTS: int = 6  # Failed sends before a message is dead-lettered
+    EMAIL_RETRY_BASE_SECONDS: float = 30.0  # Backoff doubles from here after each failure
+    EMAIL_OUTBOX_RETENTION_DAYS: int = 7  # Sent messages are deleted by a TTL index
     
     # App
     APP_NAME: str = "DocShield API"
@@ -0,0 +1,105 @@
+from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from datetime import datetime
+from typing import Optional
+from app.config import settings
+from app.core.cache import TTLCache
+from app.core.security import decode_access_token
+from app.database import get_database
+
+security = HTTPBearer()
+
+# Users by email, without password hashes. Entries are dropped on ban, role
+# and password changes; the TTL bounds staleness in other worker processes.
+user_cache = TTLCache(maxsize=10000, ttl=settings.AUTH_USER_CACHE_TTL_SECONDS)
+_user_emails = TTLCache(maxsize=10000, ttl=settings.AUTH_USER_CACHE_TTL_SECONDS)  # user id -> email
+
+async def get_user_by_email(email: str) -> Optional[dict]:
+    """Load a user through the short-TTL cache"""
+    user = user_cache.get(email)
+    if user is None:
+        db = get_database()
+        user = await db.users.find_one({"email": email}, {"hashed_password": 0, "password": 0})
+        if user is None:
+            return None
+        user_cache.set(email, user)
+    # Refreshed on every hit so active users stay invalidatable by id
+    _user_emails.set(str(user["_id"]), email)
+    # Callers get a copy so they can't corrupt the cached entry
+    return dict(user)
+
+def invalidate_user(email: Optional[str] = None, user_id: Optional[str] = None):
+    """Forget a cached user after a change to role, ban status, password or profile"""
+    if user_id is not None:
+        email = _user_emails.get(str(user_id)) or email
+        _user_emails.pop(str(user_id))
+    if email is not None:
+        user_cache.pop(email)
+
+async def get_authenticated_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
+    """Validate the bearer token and return the active user document"""
+    payload = decode_access_token(credentials.credentials)
+
+    if payload is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    email = payload.get("sub")
+    if email is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials"
+        )
+
+    user = await get_user_by_email(email)
+
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found"
+        )
+
+    # Check if password was changed after token was issued (invalidate old sessions)
+    token_pwd_changed_at = payload.get("pwd_changed_at")
+    user_pwd_changed_at = user.get("password_changed_at")
+
+    if user_pwd_changed_at:
+        user_pwd_time = user_pwd_changed_at.isoformat() if isinstance(user_pwd_changed_at, datetime) else str(user_pwd_changed_at)
+
+        if token_pwd_changed_at != user_pwd_time:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Session expired due to password change. Please login again."
+            )
+
+    # Check if user is banned
+    if user.get("banned", False):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Account has been suspended"
+        )
+
+    return user
+
+async def get_current_user_id(user: dict = Depends(get_authenticated_user)) -> str:
+    """Get current user ID from JWT token"""
+    return str(user["_id"])
+
+async def get_current_verifier(user: dict = Depends(get_authenticated_user)) -> dict:
+    """Get current user and verify verifier/admin role"""
+    role = user.get("role", "user")
+    if role not in ["verifier", "admin"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Verifier or admin role required"
+        )
+
+    return {
+        "id": str(user["_id"]),
+        "email": user["email"],
+        "name": user.get("name", "Unknown"),
+        "role": role
+    }
@@ -0,0 +1,33 @@
+from fastapi import HTTPException, status
+from typing import Dict, Iterable, List, Optional
+
+# Each endpoint maps its response fields to the stored fields they are built from
+FieldSources = Dict[str, List[str]]
+
+
+def parse_fields(fields: Optional[str], sources: FieldSources) -> List[str]:
+    """Response fields requested with ?fields=a,b (all of them when omitted)"""
+    if not fields:
+        return list(sources)
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in sources]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(sources)}"
+        )
+    return requested
+
+
+def projection_for(sources: FieldSources, selected: Iterable[str], always: Iterable[str] = ()) -> dict:
+    """Inclusion projection covering the selected response fields plus e.g. sort keys"""
+    paths = {path for field in selected for path in sources[field]} | set(always)
+    # A parent path already returns its children; listing both is a path collision
+    paths = {p for p in paths if not any(p.startswith(other + ".") for other in paths)}
+    return {path: 1 for path in paths}
+
+
+def pick(item: dict, selected: Iterable[str]) -> dict:
+    """Keep only the selected response fields"""
+    selected = set(selected)
+    return {key: value for key, value in item.items() if key in selected}
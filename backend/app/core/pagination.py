@@ -0,0 +1,64 @@
+from fastapi import HTTPException, status
+from bson import json_util
+from typing import List, Optional, Tuple
+import base64
+
+# (field, direction) pairs; every sort ends with _id so positions are unique
+SortSpec = List[Tuple[str, int]]
+
+
+def keyset_sort(field: str, direction: int) -> SortSpec:
+    """Sort on a field with _id as the tie-breaker"""
+    return [(field, direction), ("_id", direction)]
+
+
+def encode_cursor(doc: dict, sort: SortSpec) -> str:
+    """Opaque cursor holding the sort key values of the last document on a page"""
+    values = [doc.get(field) for field, _ in sort]
+    return base64.urlsafe_b64encode(json_util.dumps(values).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str, sort: SortSpec) -> list:
+    try:
+        values = json_util.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except Exception:
+        values = None
+    if not isinstance(values, list) or len(values) != len(sort):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+    return values
+
+
+def _after(sort: SortSpec, values: list) -> dict:
+    """Filter matching documents that sort strictly after the given key values"""
+    field, direction = sort[0]
+    value = values[0]
+    op = "$gt" if direction == 1 else "$lt"
+
+    if len(sort) == 1:
+        return {field: {op: value}}
+
+    tie = {field: value, **_after(sort[1:], values[1:])}
+    if value is None:
+        # Missing values sort first; comparison operators never match across types
+        return {"$or": [{field: {"$ne": None}}, tie]} if direction == 1 else tie
+    return {"$or": [{field: {op: value}}, tie]}
+
+
+def apply_cursor(query: dict, sort: SortSpec, cursor: Optional[str]) -> dict:
+    """Restrict a query to the documents after the cursor position"""
+    if not cursor:
+        return query
+    condition = _after(sort, decode_cursor(cursor, sort))
+    if not query:
+        return condition
+    return {"$and": [query, condition]}
+
+
+def next_cursor(docs: list, sort: SortSpec, limit: int) -> Optional[str]:
+    """Cursor for the following page, or None once the results run out"""
+    if len(docs) < limit:
+        return None
+    return encode_cursor(docs[-1], sort)
@@ -0,0 +1,40 @@
+from datetime import datetime, timedelta
+from typing import Dict
+from app.config import settings
+
+# Weight of each AI risk level in the review priority
+RISK_WEIGHTS = {"critical": 300, "high": 200, "medium": 100, "low": 0}
+
+
+def queue_rank(created_at: datetime, priority: int = 0) -> datetime:
+    """
+    Sort key of the verifier queue's priority mode (ascending)
+
+    The upload time moved earlier by REVIEW_QUEUE_RISK_BOOST_HOURS per 100
+    priority points: riskier documents jump ahead, and every document still
+    moves up as it waits, without ever being re-scored. Documents are only
+    scored once analyzed, so in the verifier queue this boosts flagged
+    documents; pending ones rank by upload time alone.
+    """
+    return created_at - timedelta(hours=priority / 100 * settings.REVIEW_QUEUE_RISK_BOOST_HOURS)
+
+
+def review_fields(analysis: Dict, created_at: datetime) -> Dict:
+    """
+    Queue fields to $set alongside an AI analysis
+
+    needsReview marks documents the manual review queue must show (high or
+    critical risk, authenticity below 70, or any flag); reviewPriority scores
+    them and feeds queueRank, which orders that queue. All are stored so each
+    queue is one index range scan.
+    """
+    risk_level = analysis.get("riskLevel")
+    score = float(analysis.get("authenticityScore") or 0)
+    flags = analysis.get("flags") or []
+
+    priority = RISK_WEIGHTS.get(risk_level, 0) + max(0, 100 - int(score)) + 10 * min(len(flags), 5)
+    return {
+        "needsReview": risk_level in ("high", "critical") or score < 70 or len(flags) > 0,
+        "reviewPriority": priority,
+        "queueRank": queue_rank(created_at, priority)
+    }
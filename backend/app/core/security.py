@@ -1,12 +1,22 @@
 from passlib.context import CryptContext
 from jose import JWTError, jwt
+from fastapi import HTTPException, status
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
+import asyncio
+import hashlib
+import hmac
+import time
 from app.config import settings
+from app.core.cache import TTLCache
 
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Verified token payloads keyed by SHA-256 of the token, each kept until its exp
+token_cache = TTLCache(maxsize=settings.TOKEN_CACHE_SIZE)
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify password against hash"""
     return pwd_context.verify(plain_password, hashed_password)
@@ -15,6 +25,39 @@ def get_password_hash(password: str) -> str:
     """Hash password with bcrypt"""
     return pwd_context.hash(password)
 
+# bcrypt releases the GIL, so a small thread pool gives real parallelism
+# without blocking the event loop for ~200ms per hash
+password_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="bcrypt"
+)
+_password_tasks_pending = 0
+
+async def run_in_password_pool(func, *args):
+    """Run a bcrypt call in the password pool, rejecting work when the queue is full"""
+    global _password_tasks_pending
+    if _password_tasks_pending >= settings.PASSWORD_HASH_MAX_PENDING:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, please try again shortly",
+            headers={"Retry-After": "1"}
+        )
+    
+    _password_tasks_pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(password_executor, func, *args)
+    finally:
+        _password_tasks_pending -= 1
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify password against hash without blocking the event loop"""
+    return await run_in_password_pool(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash password with bcrypt without blocking the event loop"""
+    return await run_in_password_pool(get_password_hash, password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create JWT access token"""
     to_encode = data.copy()
@@ -28,10 +71,53 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
-def decode_access_token(token: str):
-    """Decode and verify JWT token"""
+def _decode_token(token: str):
+    """Decode and verify JWT token without the cache"""
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         return payload
     except JWTError:
         return None
+
+def decode_access_token(token: str):
+    """Decode and verify JWT token, reusing earlier verifications of the same token"""
+    key = hashlib.sha256(token.encode("utf-8")).digest()
+    payload = token_cache.get(key)
+    if payload is not None:
+        return dict(payload)
+    
+    payload = _decode_token(token)
+    if payload is None:
+        return None
+    
+    # Only cache tokens with an expiry so the cache can never outlive them
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        remaining = exp - time.time()
+        if remaining > 0:
+            token_cache.set(key, payload, ttl=remaining)
+    
+    return dict(payload)
+
+def _share_token_signature(share_id: str, password_hash: str, expires_at: int) -> str:
+    # Signing over the password hash means a new share password voids old tokens
+    message = f"{share_id}.{expires_at}.{password_hash}".encode("utf-8")
+    return hmac.new(settings.SECRET_KEY.encode("utf-8"), message, hashlib.sha256).hexdigest()
+
+def create_share_access_token(share_id: str, password_hash: str, expires_at: int) -> str:
+    """Signed token proving the password of one share was verified, valid until expires_at (unix time)"""
+    return f"{expires_at}.{_share_token_signature(share_id, password_hash, expires_at)}"
+
+def verify_share_access_token(token: str, share_id: str, password_hash: str) -> bool:
+    """Check a share access token with a single HMAC instead of bcrypt"""
+    try:
+        expires_at, signature = token.split(".", 1)
+        expires_at = int(expires_at)
+    except (AttributeError, ValueError):
+        return False
+    
+    if expires_at <= time.time():
+        return False
+    
+    expected = _share_token_signature(share_id, password_hash, expires_at)
+    return hmac.compare_digest(signature, expected)
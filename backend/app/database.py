@@ -1,4 +1,5 @@
 from motor.motor_asyncio import AsyncIOMotorClient
+from bson import ObjectId
 from app.config import settings
 
 class Database:
@@ -19,3 +20,11 @@ async def close_mongo_connection():
 def get_database():
     """Get database instance"""
     return db.client.docshield
+
+async def find_users_by_ids(user_ids, projection=None) -> dict:
+    """Fetch many users with one $in query, keyed by str(_id)"""
+    ids = list({ObjectId(str(i)) for i in user_ids if i and ObjectId.is_valid(str(i))})
+    if not ids:
+        return {}
+    users = await get_database().users.find({"_id": {"$in": ids}}, projection).to_list(length=None)
+    return {str(user["_id"]): user for user in users}
@@ -0,0 +1,122 @@
+"""
+Declarative MongoDB index registry
+
+Every index the API relies on is listed here by collection and ensured at
+startup. Names are explicit so check_indexes.py can compare the registry
+with what the server actually has.
+"""
+from pymongo import IndexModel, ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
+from app.config import settings
+
+INDEXES = {
+    "users": [
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+        # Admin user list, optionally filtered by role
+        IndexModel([("createdAt", DESCENDING), ("_id", DESCENDING)], name="created_at"),
+        IndexModel([("role", ASCENDING), ("createdAt", DESCENDING), ("_id", DESCENDING)], name="role_created_at"),
+    ],
+    "documents": [
+        # My documents listing and per-user counts
+        IndexModel([("userId", ASCENDING), ("createdAt", DESCENDING), ("_id", DESCENDING)], name="user_created_at"),
+        # Duplicate upload check
+        IndexModel([("userId", ASCENDING), ("fileHash", ASCENDING)], name="user_file_hash"),
+        # Review queues and status counts. isDeleted stays out of the key:
+        # routers filter it with $ne, which would break the createdAt ordering
+        IndexModel(
+            [("verificationStatus", ASCENDING), ("createdAt", ASCENDING), ("_id", ASCENDING)],
+            name="status_created_at"
+        ),
+        # Verifier document list (all sort options) and admin activity log
+        IndexModel([("createdAt", DESCENDING), ("_id", DESCENDING)], name="created_at"),
+        IndexModel([("fileName", ASCENDING), ("_id", ASCENDING)], name="file_name"),
+        IndexModel([("fileSize", ASCENDING), ("_id", ASCENDING)], name="file_size"),
+        # Purge of soft-deleted documents
+        IndexModel(
+            [("deletedAt", ASCENDING)],
+            name="deleted_at",
+            partialFilterExpression={"isDeleted": True}
+        ),
+        # Retry job for provisional analyses
+        IndexModel(
+            [("createdAt", ASCENDING)],
+            name="provisional_created_at",
+            partialFilterExpression={"aiAnalysis.provisional": True}
+        ),
+        # Verifier queue in priority mode and the manual review queue
+        IndexModel(
+            [("verificationStatus", ASCENDING), ("queueRank", ASCENDING), ("_id", ASCENDING)],
+            name="status_queue_rank"
+        ),
+    ],
+    "reviews": [
+        # Verifier history, newest first with _id as the keyset tie-breaker
+        IndexModel(
+            [("reviewer_id", ASCENDING), ("reviewed_at", DESCENDING), ("_id", DESCENDING)],
+            name="reviewer_reviewed_at"
+        ),
+        # Verifier history filtered by decision
+        IndexModel(
+            [("reviewer_id", ASCENDING), ("decision", ASCENDING), ("reviewed_at", DESCENDING), ("_id", DESCENDING)],
+            name="reviewer_decision_reviewed_at"
+        ),
+        # Full history of one document
+        IndexModel(
+            [("document_id", ASCENDING), ("reviewed_at", DESCENDING), ("_id", DESCENDING)],
+            name="document_reviewed_at"
+        ),
+        # Analytics over a date range
+        IndexModel([("reviewed_at", DESCENDING)], name="reviewed_at"),
+    ],
+    "review_rollups": [
+        # One counter per day, verifier and decision; analytics scans a day range
+        IndexModel(
+            [("day", ASCENDING), ("reviewer_id", ASCENDING), ("decision", ASCENDING)],
+            name="day_reviewer_decision_unique", unique=True
+        ),
+        # Per-verifier dashboard stats
+        IndexModel([("reviewer_id", ASCENDING), ("day", ASCENDING)], name="reviewer_day"),
+    ],
+    "shares": [
+        IndexModel([("share_id", ASCENDING)], name="share_id_unique", unique=True),
+        IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING)], name="user_created_at"),
+    ],
+    "certificates": [
+        IndexModel([("certificateId", ASCENDING)], name="certificate_id_unique", unique=True),
+        IndexModel([("documentId", ASCENDING)], name="document_id"),
+    ],
+    "notification_preferences": [
+        IndexModel([("user_id", ASCENDING)], name="user_id_unique", unique=True),
+    ],
+    "chat_sessions": [
+        IndexModel([("session_id", ASCENDING)], name="session_id_unique", unique=True),
+        # Idle sessions expire on their own
+        IndexModel(
+            [("last_used_at", ASCENDING)],
+            name="last_used_at_ttl",
+            expireAfterSeconds=settings.CHAT_SESSION_TTL_DAYS * 24 * 3600
+        ),
+    ],
+    "email_outbox": [
+        # Due messages for the outbox worker
+        IndexModel([("status", ASCENDING), ("next_attempt_at", ASCENDING)], name="status_next_attempt"),
+        # Sent messages expire; dead letters have no sent_at and are kept
+        IndexModel(
+            [("sent_at", ASCENDING)],
+            name="sent_at_ttl",
+            expireAfterSeconds=settings.EMAIL_OUTBOX_RETENTION_DAYS * 24 * 3600
+        ),
+    ],
+}
+
+
+async def ensure_indexes(db):
+    """Create any missing registry indexes (existing ones are left untouched)"""
+    for collection, indexes in INDEXES.items():
+        try:
+            await db[collection].create_indexes(indexes)
+        except OperationFailure as e:
+            # e.g. duplicates blocking a unique index or an index redefined
+            # under the same name - keep serving and let check_indexes.py report it
+            print(f"⚠️ Could not ensure indexes on {collection}: {e}")
+    print("✅ MongoDB indexes ensured")
@@ -15,13 +15,35 @@ async def lifespan(app: FastAPI):
     # Startup
     await connect_to_mongo()
     
+    # Ensure the index registry before serving queries
+    from app.database import get_database
+    from app.indexes import ensure_indexes
+    await ensure_indexes(get_database())
+    
     # Start file cleanup scheduler
     from app.services.cleanup_scheduler import cleanup_scheduler
     cleanup_scheduler.start()
     
+    # Start retry job for analyses scored while Groq was unavailable
+    from app.services.analysis_retry_scheduler import analysis_retry_scheduler
+    analysis_retry_scheduler.start()
+    
+    # Keep admin dashboard statistics warm
+    from app.services.admin_stats import admin_stats
+    admin_stats.start()
+    
+    # Send queued emails in the background
+    from app.services.email_outbox import email_outbox_worker
+    from app.services.email_service import email_service
+    email_outbox_worker.start()
+    
     yield
     
     # Shutdown
+    email_outbox_worker.stop()
+    await email_service.close()
+    admin_stats.stop()
+    analysis_retry_scheduler.stop()
     cleanup_scheduler.stop()
     await close_mongo_connection()
 
@@ -46,6 +68,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Chat-Session-Id", "X-Next-Cursor"],
 )
 
 # Include routers
@@ -79,7 +102,12 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    from app.services.document_analyzer import document_analyzer
+    breaker = document_analyzer.breaker.snapshot()
+    return {
+        "status": "healthy" if breaker["state"] == "closed" else "degraded",
+        "ai": breaker
+    }
 
 if __name__ == "__main__":
     import uvicorn
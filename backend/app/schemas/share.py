@@ -23,6 +23,15 @@ class ShareResponse(BaseModel):
     share_url: str
 
 
+class ShareUnlockRequest(BaseModel):
+    password: str
+
+
+class ShareUnlockResponse(BaseModel):
+    access_token: str
+    expires_at: datetime
+
+
 class PublicShareResponse(BaseModel):
     document_id: str
     file_name: str
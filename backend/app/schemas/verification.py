@@ -13,6 +13,7 @@ class AIAnalysisResult(BaseModel):
     confidence: float
     processingTime: float
     analyzedAt: datetime
+    provisional: bool = False  # Heuristic score while AI was unavailable
 
 class VerificationRequest(BaseModel):
     document_id: str
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Optional, List, Literal
 from datetime import datetime
 from bson import ObjectId as BsonObjectId
 
@@ -13,6 +13,14 @@ class VerificationUpdate(BaseModel):
     verifier_notes: Optional[str] = None
     decision: Optional[str] = None  # approved, rejected, flagged
 
+class BulkReviewItem(BaseModel):
+    document_id: str
+    decision: Literal["approved", "rejected", "flagged"]
+    notes: Optional[str] = None
+
+class BulkReviewRequest(BaseModel):
+    reviews: List[BulkReviewItem] = Field(..., min_length=1, max_length=100)
+
 class VerificationHistory(BaseModel):
     timestamp: datetime
     action: str
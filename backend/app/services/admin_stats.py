@@ -0,0 +1,133 @@
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+import asyncio
+import time
+from app.config import settings
+from app.database import get_database
+
+class AdminStatsService:
+    """
+    System-wide statistics for the admin dashboard
+
+    The counts come from one aggregation per collection (a $facet over
+    documents). The result is kept in memory and refreshed in the background,
+    so dashboard requests never wait on a full scan once the first snapshot
+    exists.
+    """
+
+    def __init__(self):
+        self.scheduler = AsyncIOScheduler()
+        self.refresh_seconds = settings.ADMIN_STATS_REFRESH_SECONDS
+        self.max_age_seconds = settings.ADMIN_STATS_MAX_AGE_SECONDS
+        self._snapshot: Optional[Dict] = None
+        self._computed_at = 0.0  # time.monotonic() of the snapshot
+        self._lock = asyncio.Lock()
+        self._pending_refreshes = set()
+
+    async def compute(self) -> Dict:
+        """Count users, documents and storage in two aggregations"""
+        db = get_database()
+        week_ago = datetime.utcnow() - timedelta(days=7)
+
+        users_by_role = await db.users.aggregate([
+            {"$group": {"_id": "$role", "n": {"$sum": 1}}}
+        ]).to_list(None)
+
+        documents_result = await db.documents.aggregate([
+            {
+                "$facet": {
+                    "by_status": [
+                        {"$group": {
+                            "_id": "$verificationStatus",
+                            "n": {"$sum": 1},
+                            "bytes": {"$sum": "$fileSize"}
+                        }}
+                    ],
+                    # Users who uploaded documents in the last 7 days, counted on the server
+                    "owners": [
+                        {"$match": {"createdAt": {"$gte": week_ago}}},
+                        {"$group": {"_id": "$userId"}},
+                        {"$count": "n"}
+                    ]
+                }
+            }
+        ], allowDiskUse=True).to_list(1)
+
+        documents = documents_result[0] if documents_result else {}
+        by_role = {row["_id"]: row["n"] for row in users_by_role}
+        by_status = {row["_id"]: row["n"] for row in documents.get("by_status", [])}
+        total_storage = sum(row["bytes"] for row in documents.get("by_status", []))
+        owners = documents.get("owners", [])
+
+        return {
+            "users": {
+                "total": sum(by_role.values()),
+                "admins": by_role.get("admin", 0),
+                "verifiers": by_role.get("verifier", 0),
+                "regular": by_role.get("user", 0),
+                "active_7d": owners[0]["n"] if owners else 0
+            },
+            "documents": {
+                "total": sum(by_status.values()),
+                "verified": by_status.get("verified", 0),
+                "pending": by_status.get("pending", 0),
+                "flagged": by_status.get("flagged", 0)
+            },
+            "storage": {
+                "total_bytes": total_storage,
+                "total_mb": round(total_storage / (1024 * 1024), 2),
+                "total_gb": round(total_storage / (1024 * 1024 * 1024), 2)
+            },
+            "generated_at": datetime.utcnow().isoformat()
+        }
+
+    async def refresh(self) -> Dict:
+        """Recompute the snapshot; concurrent callers share one computation"""
+        started = time.monotonic()
+        async with self._lock:
+            if self._snapshot is not None and self._computed_at >= started:
+                return self._snapshot
+            snapshot = await self.compute()
+            self._snapshot = snapshot
+            self._computed_at = time.monotonic()
+            return snapshot
+
+    async def get(self) -> Dict:
+        """Latest snapshot, recomputed only when older than ADMIN_STATS_MAX_AGE_SECONDS"""
+        if self._snapshot is not None and time.monotonic() - self._computed_at < self.max_age_seconds:
+            return self._snapshot
+        return await self.refresh()
+
+    def invalidate(self):
+        """Recompute in the background, e.g. after an admin changes users; reads keep the current snapshot meanwhile"""
+        task = asyncio.create_task(self._scheduled_refresh())
+        self._pending_refreshes.add(task)
+        task.add_done_callback(self._pending_refreshes.discard)
+
+    async def _scheduled_refresh(self):
+        try:
+            await self.refresh()
+        except Exception as e:
+            print(f"❌ Admin stats refresh failed: {e}")
+
+    def start(self):
+        """Start refreshing the snapshot in the background"""
+        self.scheduler.add_job(
+            self._scheduled_refresh,
+            'interval',
+            seconds=self.refresh_seconds,
+            id='refresh_admin_stats',
+            next_run_time=datetime.now()
+        )
+
+        self.scheduler.start()
+        print(f"✅ Admin stats refresh started (every {self.refresh_seconds}s)")
+
+    def stop(self):
+        """Stop the scheduler"""
+        self.scheduler.shutdown()
+        print("🛑 Admin stats refresh stopped")
+
+# Singleton instance
+admin_stats = AdminStatsService()
@@ -0,0 +1,85 @@
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from datetime import datetime
+import time
+from app.config import settings
+from app.core.review_priority import review_fields
+from app.database import get_database
+from app.services.document_analyzer import document_analyzer
+
+class AnalysisRetryScheduler:
+    def __init__(self):
+        self.scheduler = AsyncIOScheduler()
+        self.interval_minutes = settings.ANALYSIS_RETRY_INTERVAL_MINUTES
+        self.batch_size = 20  # Documents re-analyzed per run
+        self.max_attempts = 5  # Give up on a document after this many retries
+
+    async def retry_provisional_analyses(self):
+        """Re-run AI analysis for documents scored by the heuristic fallback"""
+        if document_analyzer.breaker.state == document_analyzer.breaker.OPEN:
+            print("⏸️ Skipping analysis retry: AI circuit is open")
+            return
+
+        try:
+            db = get_database()
+
+            documents = await db.documents.find(
+                {
+                    "aiAnalysis.provisional": True,
+                    "aiAnalysis.retryAttempts": {"$not": {"$gte": self.max_attempts}},
+                    "isDeleted": {"$ne": True}
+                },
+                {"extractedText": 1, "fileName": 1, "fileType": 1, "createdAt": 1, "metadata.category": 1, "aiAnalysis.retryAttempts": 1}
+            ).sort("createdAt", 1).to_list(length=self.batch_size)
+
+            upgraded = 0
+            for doc in documents:
+                start_time = time.time()
+                analysis = await document_analyzer.analyze_document(
+                    extracted_text=doc.get("extractedText", ""),
+                    file_name=doc["fileName"],
+                    file_type=doc["fileType"],
+                    category=doc.get("metadata", {}).get("category", "other")
+                )
+
+                if analysis.get("success") and not analysis.get("provisional"):
+                    analysis["processingTime"] = time.time() - start_time
+                    analysis["analyzedAt"] = datetime.utcnow()
+                    await db.documents.update_one(
+                        {"_id": doc["_id"]},
+                        {"$set": {"aiAnalysis": analysis, **review_fields(analysis, doc["createdAt"]), "updatedAt": datetime.utcnow()}}
+                    )
+                    upgraded += 1
+                else:
+                    await db.documents.update_one(
+                        {"_id": doc["_id"]},
+                        {"$inc": {"aiAnalysis.retryAttempts": 1}}
+                    )
+                    # Upstream is still failing, try again next run
+                    if document_analyzer.breaker.state != document_analyzer.breaker.CLOSED:
+                        break
+
+            if documents:
+                print(f"🔁 Analysis retry: {upgraded}/{len(documents)} provisional analyses replaced")
+
+        except Exception as e:
+            print(f"❌ Analysis retry job failed: {e}")
+
+    def start(self):
+        """Start the analysis retry scheduler"""
+        self.scheduler.add_job(
+            self.retry_provisional_analyses,
+            'interval',
+            minutes=self.interval_minutes,
+            id='retry_provisional_analyses'
+        )
+
+        self.scheduler.start()
+        print(f"✅ Analysis retry scheduler started (runs every {self.interval_minutes}m)")
+
+    def stop(self):
+        """Stop the scheduler"""
+        self.scheduler.shutdown()
+        print("🛑 Analysis retry scheduler stopped")
+
+# Singleton instance
+analysis_retry_scheduler = AnalysisRetryScheduler()
@@ -0,0 +1,153 @@
+from bson import ObjectId
+from pymongo import ReturnDocument
+from datetime import datetime
+from typing import Dict, List, Optional
+from app.config import settings
+from app.database import get_database
+from app.services.groq_client import create_groq_client
+
+SUMMARY_PROMPT = """You maintain the running memory of a conversation between a user and DocShield Assistant.
+Merge the existing summary with the new turns into one updated summary.
+Keep names, document details, decisions and open questions. Drop greetings and filler.
+Write at most {max_words} words of plain prose.
+
+Existing summary:
+{summary}
+
+New turns:
+{turns}"""
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token plus message overhead)"""
+    return len(text or "") // 4 + 4
+
+
+class ChatMemory:
+    """
+    Server-side chat sessions with a rolling summary
+
+    Each session keeps a summary of older turns plus the most recent turns
+    verbatim, so the prompt sent to the model stays bounded however long the
+    conversation runs.
+    """
+
+    def __init__(self):
+        self.client = create_groq_client(timeout=settings.GROQ_TIMEOUT_SECONDS)
+        self.recent_turns = settings.CHAT_MEMORY_RECENT_TURNS
+        self.token_budget = settings.CHAT_MEMORY_TOKEN_BUDGET
+        self.max_stored_turns = self.recent_turns * 4  # Hard cap if summarizing keeps failing
+
+    async def load_session(self, session_id: str, owner: str) -> Optional[Dict]:
+        """Fetch a session, creating it on first use. Returns None if owned by someone else"""
+        db = get_database()
+        now = datetime.utcnow()
+        session = await db.chat_sessions.find_one_and_update(
+            {"session_id": session_id},
+            {
+                "$setOnInsert": {
+                    "session_id": session_id,
+                    "owner": owner,
+                    "summary": "",
+                    "turns": [],
+                    "created_at": now
+                },
+                "$set": {"last_used_at": now}
+            },
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        if session.get("owner") != owner:
+            return None
+        return session
+
+    def build_messages(self, system_message: Dict, session: Dict, new_messages: List[Dict]) -> List[Dict]:
+        """System prompt + summary + as many recent turns as the token budget allows"""
+        prefix = [system_message]
+        if session.get("summary"):
+            prefix.append({
+                "role": "system",
+                "content": f"Summary of the earlier conversation:\n{session['summary']}"
+            })
+
+        used = sum(estimate_tokens(m["content"]) for m in prefix + new_messages)
+
+        history = []
+        for turn in reversed(session.get("turns", [])[-self.recent_turns:]):
+            cost = estimate_tokens(turn["content"])
+            if used + cost > self.token_budget:
+                break
+            history.append({"role": turn["role"], "content": turn["content"]})
+            used += cost
+        history.reverse()
+
+        return prefix + history + new_messages
+
+    async def append_turns(self, session_id: str, turns: List[Dict]):
+        """Store finished turns, then fold older ones into the summary if needed"""
+        db = get_database()
+        entries = [
+            {"id": ObjectId(), "role": t["role"], "content": t["content"], "at": datetime.utcnow()}
+            for t in turns
+        ]
+        session = await db.chat_sessions.find_one_and_update(
+            {"session_id": session_id},
+            {
+                "$push": {"turns": {"$each": entries}},
+                "$set": {"last_used_at": datetime.utcnow()}
+            },
+            projection={"turns": 1, "summary": 1, "summary_version": 1},
+            return_document=ReturnDocument.AFTER
+        )
+        if session and len(session.get("turns", [])) > self.recent_turns:
+            await self.summarize(session)
+
+    async def summarize(self, session: Dict):
+        """Fold all but the most recent turns into the rolling summary"""
+        db = get_database()
+        turns = session["turns"]
+        folded = turns[:-self.recent_turns]
+        transcript = "\n".join(f"{t['role']}: {t['content']}" for t in folded)
+
+        try:
+            response = await self.client.chat.completions.create(
+                model=settings.GROQ_MODEL,
+                messages=[{
+                    "role": "user",
+                    "content": SUMMARY_PROMPT.format(
+                        max_words=settings.CHAT_SUMMARY_MAX_TOKENS * 3 // 4,
+                        summary=session.get("summary") or "(none)",
+                        turns=transcript
+                    )
+                }],
+                temperature=0.2,
+                max_tokens=settings.CHAT_SUMMARY_MAX_TOKENS
+            )
+            summary = response.choices[0].message.content.strip()
+        except Exception as e:
+            print(f"⚠️ Chat summarization failed: {e}")
+            if len(turns) > self.max_stored_turns:
+                await db.chat_sessions.update_one(
+                    {"_id": session["_id"]},
+                    {"$push": {"turns": {"$each": [], "$slice": -self.max_stored_turns}}}
+                )
+            return
+
+        # Only the summarizer that read this version may write; turns appended
+        # meanwhile are newer than the folded ones and are kept
+        await db.chat_sessions.update_one(
+            {"_id": session["_id"], "summary_version": session.get("summary_version")},
+            {
+                "$set": {"summary": summary},
+                "$inc": {"summary_version": 1},
+                "$pull": {"turns": {"id": {"$lte": folded[-1]["id"]}}}
+            }
+        )
+
+    async def delete_session(self, session_id: str, owner: str) -> bool:
+        db = get_database()
+        result = await db.chat_sessions.delete_one({"session_id": session_id, "owner": owner})
+        return result.deleted_count > 0
+
+# Singleton instance
+chat_memory = ChatMemory()
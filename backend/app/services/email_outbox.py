@@ -0,0 +1,104 @@
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from datetime import datetime, timedelta
+from pymongo import ReturnDocument, UpdateOne
+from typing import Dict, List
+import asyncio
+from app.config import settings
+from app.database import get_database
+from app.services.email_service import email_service
+
+class EmailOutboxWorker:
+    """
+    Sends messages queued in the `email_outbox` collection
+
+    Each poll claims due messages one by one with find_one_and_update, pushing
+    next_attempt_at forward as a lease so other workers (and other processes)
+    skip them. Failures are retried with exponential backoff; after
+    EMAIL_MAX_ATTEMPTS a message is marked "dead" and kept for inspection.
+    """
+
+    def __init__(self):
+        self.scheduler = AsyncIOScheduler()
+        self.poll_seconds = settings.EMAIL_OUTBOX_POLL_SECONDS
+        self.batch_size = settings.EMAIL_OUTBOX_BATCH_SIZE
+        self.max_attempts = settings.EMAIL_MAX_ATTEMPTS
+        self.retry_base_seconds = settings.EMAIL_RETRY_BASE_SECONDS
+        # A claimed message becomes due again if its worker dies mid-send
+        self.lease = timedelta(seconds=settings.EMAIL_TIMEOUT_SECONDS * 3)
+
+    def backoff(self, attempts: int) -> timedelta:
+        """Delay before the next try after `attempts` failed sends"""
+        return timedelta(seconds=min(self.retry_base_seconds * 2 ** (attempts - 1), 6 * 3600))
+
+    async def claim_batch(self) -> List[Dict]:
+        """Lease up to batch_size due messages, oldest first"""
+        db = get_database()
+        messages = []
+        for _ in range(self.batch_size):
+            now = datetime.utcnow()
+            message = await db.email_outbox.find_one_and_update(
+                {"status": "pending", "next_attempt_at": {"$lte": now}},
+                {"$set": {"next_attempt_at": now + self.lease}, "$inc": {"attempts": 1}},
+                sort=[("next_attempt_at", 1)],
+                return_document=ReturnDocument.AFTER
+            )
+            if not message:
+                break
+            messages.append(message)
+        return messages
+
+    async def send_due_messages(self):
+        """Send one batch and record each outcome"""
+        try:
+            messages = await self.claim_batch()
+            if not messages:
+                return
+
+            results = await asyncio.gather(
+                *(email_service.deliver(m["to"], m["subject"], m["html"], m.get("from")) for m in messages),
+                return_exceptions=True
+            )
+
+            now = datetime.utcnow()
+            outcomes = []
+            sent = dead = 0
+            for message, result in zip(messages, results):
+                if not isinstance(result, Exception):
+                    sent += 1
+                    update = {"$set": {"status": "sent", "sent_at": now}, "$unset": {"last_error": ""}}
+                elif message["attempts"] >= self.max_attempts:
+                    dead += 1
+                    update = {"$set": {"status": "dead", "failed_at": now, "last_error": str(result)[:500]}}
+                else:
+                    update = {"$set": {
+                        "next_attempt_at": now + self.backoff(message["attempts"]),
+                        "last_error": str(result)[:500]
+                    }}
+                outcomes.append(UpdateOne({"_id": message["_id"]}, update))
+            await get_database().email_outbox.bulk_write(outcomes, ordered=False)
+
+            retrying = len(messages) - sent - dead
+            print(f"📧 Email outbox: {sent} sent, {retrying} retrying, {dead} dead-lettered")
+
+        except Exception as e:
+            print(f"❌ Email outbox run failed: {e}")
+
+    def start(self):
+        """Start the outbox worker"""
+        self.scheduler.add_job(
+            self.send_due_messages,
+            'interval',
+            seconds=self.poll_seconds,
+            id='send_email_outbox'
+        )
+
+        self.scheduler.start()
+        print(f"✅ Email outbox worker started (polls every {self.poll_seconds}s)")
+
+    def stop(self):
+        """Stop the scheduler"""
+        self.scheduler.shutdown()
+        print("🛑 Email outbox worker stopped")
+
+# Singleton instance
+email_outbox_worker = EmailOutboxWorker()
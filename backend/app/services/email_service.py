@@ -1,6 +1,8 @@
 import httpx
-from typing import Dict, Optional
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
 from app.config import settings
+from app.database import get_database
 
 class EmailService:
     """Service for sending emails via Next.js API"""
@@ -8,6 +10,45 @@ class EmailService:
     def __init__(self):
         # Next.js API endpoint (adjust port if different)
         self.api_url = f"{settings.APP_URL}/api/send-email"
+        self._client: Optional[httpx.AsyncClient] = None
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """One pooled client per process, so messages reuse connections to the relay"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=settings.EMAIL_TIMEOUT_SECONDS,
+                limits=httpx.Limits(
+                    max_connections=settings.EMAIL_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.EMAIL_MAX_CONNECTIONS
+                )
+            )
+        return self._client
+    
+    async def close(self):
+        """Close the pooled client on shutdown"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    async def deliver(
+        self,
+        to: str,
+        subject: str,
+        html: str,
+        from_email: Optional[str] = None
+    ):
+        """POST one message to the relay; raises if it is not accepted"""
+        response = await self._get_client().post(
+            self.api_url,
+            json={
+                "to": to,
+                "subject": subject,
+                "html": html,
+                "from": from_email
+            }
+        )
+        if response.status_code != 200:
+            raise RuntimeError(f"Relay returned {response.status_code}: {response.text[:200]}")
     
     async def send_email(
         self,
@@ -17,7 +58,10 @@ class EmailService:
         from_email: Optional[str] = None
     ) -> bool:
         """
-        Send email via Next.js API
+        Send email via Next.js API right away
+        
+        Request handlers should use enqueue() instead; this is for the
+        outbox worker and the test endpoint.
         
         Args:
             to: Recipient email
@@ -29,28 +73,43 @@ class EmailService:
             bool: True if sent successfully
         """
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    self.api_url,
-                    json={
-                        "to": to,
-                        "subject": subject,
-                        "html": html,
-                        "from": from_email
-                    }
-                )
-                
-                if response.status_code == 200:
-                    print(f"✅ Email sent to {to}: {subject}")
-                    return True
-                else:
-                    print(f"❌ Email failed: {response.text}")
-                    return False
-                    
+            await self.deliver(to, subject, html, from_email)
+            print(f"✅ Email sent to {to}: {subject}")
+            return True
         except Exception as e:
             print(f"❌ Email error: {str(e)}")
             return False
     
+    async def enqueue(
+        self,
+        to: str,
+        subject: str,
+        html: str,
+        from_email: Optional[str] = None
+    ):
+        """Store a message in the outbox; the outbox worker sends it"""
+        await self.enqueue_many([{"to": to, "subject": subject, "html": html, "from": from_email}])
+    
+    async def enqueue_many(self, messages: List[Dict]):
+        """Store several {to, subject, html[, from]} messages in one insert"""
+        if not messages:
+            return
+        db = get_database()
+        now = datetime.utcnow()
+        await db.email_outbox.insert_many([
+            {
+                "to": message["to"],
+                "subject": message["subject"],
+                "html": message["html"],
+                "from": message.get("from"),
+                "status": "pending",
+                "attempts": 0,
+                "next_attempt_at": now,
+                "created_at": now
+            }
+            for message in messages
+        ], ordered=False)
+    
     def get_document_verified_template(
         self,
         user_name: str,
@@ -249,6 +308,37 @@ class EmailService:
         </body>
         </html>
         """
+    
+    def get_review_decision_email(
+        self,
+        user_name: str,
+        document_name: str,
+        decision: str,
+        reviewer_notes: Optional[str],
+        reviewer_name: str
+    ) -> Tuple[str, str]:
+        """Subject and HTML telling an owner about a verifier's decision"""
+        if decision == "approved":
+            html = self.get_document_verified_template(
+                user_name=user_name,
+                document_name=document_name
+            )
+            return "✅ Document Verified - DocShield", html
+        if decision == "rejected":
+            html = self.get_document_rejected_template(
+                user_name=user_name,
+                document_name=document_name,
+                reviewer_notes=reviewer_notes or "No specific reason provided.",
+                reviewer_name=reviewer_name
+            )
+            return "❌ Document Rejected - DocShield", html
+        html = self.get_document_flagged_template(
+            user_name=user_name,
+            document_name=document_name,
+            reviewer_notes=reviewer_notes or "Document requires additional review.",
+            reviewer_name=reviewer_name
+        )
+        return "⚠️ Document Flagged - DocShield", html
 
 # Singleton instance
 email_service = EmailService()
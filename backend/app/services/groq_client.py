@@ -0,0 +1,119 @@
+"""
+Groq client factory with optional record/replay
+
+GROQ_MODE=live    talk to Groq (or GROQ_BASE_URL, e.g. the local stub server)
+GROQ_MODE=record  talk to the upstream and save every completion to GROQ_CASSETTE_DIR
+GROQ_MODE=replay  serve completions from GROQ_CASSETTE_DIR without any network access
+"""
+from groq import AsyncGroq
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+import asyncio
+import hashlib
+import json
+import time
+
+from app.config import settings
+
+
+class CassetteMissError(Exception):
+    """Raised in replay mode when no recording matches the request"""
+
+
+def _to_namespace(value: Any) -> Any:
+    """Turn recorded JSON into objects with the same attribute access as SDK models"""
+    if isinstance(value, dict):
+        return SimpleNamespace(**{k: _to_namespace(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return [_to_namespace(v) for v in value]
+    return value
+
+
+class CassetteStore:
+    """One JSON file per request, keyed by a digest of the request body"""
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+
+    @staticmethod
+    def request_key(kwargs: dict) -> str:
+        body = {k: kwargs.get(k) for k in ("model", "messages", "temperature", "max_tokens", "stream")}
+        return hashlib.sha256(json.dumps(body, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:32]
+
+    def load(self, kwargs: dict) -> dict:
+        path = self.directory / f"{self.request_key(kwargs)}.json"
+        if not path.exists():
+            raise CassetteMissError(f"No Groq recording for request {path.stem}")
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def save(self, kwargs: dict, recording: dict):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"{self.request_key(kwargs)}.json"
+        recording["request"] = {k: kwargs.get(k) for k in ("model", "messages", "temperature", "max_tokens", "stream")}
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(recording, f, indent=2, default=str)
+
+
+class _AsyncRecordReplayCompletions:
+    def __init__(self, client, store: CassetteStore, mode: str):
+        self._client = client
+        self._store = store
+        self._mode = mode
+
+    async def create(self, **kwargs):
+        if self._mode == "replay":
+            recording = self._store.load(kwargs)
+            if kwargs.get("stream"):
+                return self._replay_stream(recording["chunks"])
+            return _to_namespace(recording["response"])
+
+        result = await self._client.chat.completions.create(**kwargs)
+        if kwargs.get("stream"):
+            return self._record_stream(result, kwargs)
+        self._store.save(kwargs, {"response": result.model_dump()})
+        return result
+
+    async def _replay_stream(self, chunks):
+        for entry in chunks:
+            if settings.GROQ_REPLAY_REALTIME and entry["delay"]:
+                await asyncio.sleep(entry["delay"])
+            yield _to_namespace(entry["chunk"])
+
+    async def _record_stream(self, stream, kwargs):
+        chunks = []
+        last = time.monotonic()
+        async for chunk in stream:
+            now = time.monotonic()
+            chunks.append({"delay": round(now - last, 4), "chunk": chunk.model_dump()})
+            last = now
+            yield chunk
+        self._store.save(kwargs, {"chunks": chunks})
+
+
+class AsyncRecordReplayClient:
+    """Drop-in for AsyncGroq exposing only chat.completions.create"""
+
+    def __init__(self, client, store: CassetteStore, mode: str):
+        self.chat = SimpleNamespace(completions=_AsyncRecordReplayCompletions(client, store, mode))
+
+
+def create_groq_client(**client_kwargs):
+    """Build an async Groq client honouring GROQ_BASE_URL and GROQ_MODE"""
+    if settings.GROQ_BASE_URL:
+        client_kwargs.setdefault("base_url", settings.GROQ_BASE_URL)
+
+    mode = settings.GROQ_MODE
+    if mode not in ("live", "record", "replay"):
+        raise ValueError(f"Invalid GROQ_MODE: {mode}")
+
+    # Replay never touches the network, so no real client is needed
+    client = None
+    if mode != "replay":
+        client = AsyncGroq(api_key=settings.GROQ_API_KEY, **client_kwargs)
+
+    if mode == "live":
+        return client
+
+    return AsyncRecordReplayClient(client, CassetteStore(settings.GROQ_CASSETTE_DIR), mode)
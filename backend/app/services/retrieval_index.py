@@ -0,0 +1,172 @@
+from bson import ObjectId
+from collections import OrderedDict, Counter
+from typing import Dict, List
+import asyncio
+import math
+import re
+from app.config import settings
+from app.database import get_database
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have", "in",
+    "is", "it", "its", "of", "on", "or", "that", "the", "this", "to", "was", "were", "will",
+    "with", "what", "which", "who", "how", "my", "me", "i", "you", "your", "do", "does", "can"
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stopwords"""
+    return [t for t in TOKEN_RE.findall((text or "").lower()) if t not in STOPWORDS and len(t) > 1]
+
+
+def split_passages(text: str, size: int = 120, overlap: int = 30) -> List[str]:
+    """Split text into overlapping word windows"""
+    words = (text or "").split()
+    if not words:
+        return []
+    step = max(size - overlap, 1)
+    return [" ".join(words[i:i + size]) for i in range(0, max(len(words) - overlap, 1), step)]
+
+
+class UserIndex:
+    """BM25 inverted index over one user's document passages"""
+
+    K1 = 1.5
+    B = 0.75
+
+    def __init__(self):
+        self.passages: Dict[int, dict] = {}
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self.document_passages: Dict[str, List[int]] = {}
+        self.total_length = 0
+        self._next_id = 0
+
+    def add_document(self, document_id: str, file_name: str, text: str):
+        """Index a document's passages, replacing any previous version"""
+        self.remove_document(document_id)
+        passage_ids = []
+        for passage in split_passages(text):
+            tokens = tokenize(passage)
+            if not tokens:
+                continue
+            pid = self._next_id
+            self._next_id += 1
+            self.passages[pid] = {
+                "document_id": document_id,
+                "file_name": file_name,
+                "text": passage,
+                "length": len(tokens)
+            }
+            for term, tf in Counter(tokens).items():
+                self.postings.setdefault(term, {})[pid] = tf
+            self.total_length += len(tokens)
+            passage_ids.append(pid)
+        self.document_passages[document_id] = passage_ids
+
+    def remove_document(self, document_id: str):
+        """Drop a document's passages from the index"""
+        for pid in self.document_passages.pop(document_id, []):
+            passage = self.passages.pop(pid)
+            self.total_length -= passage["length"]
+            for term in set(tokenize(passage["text"])):
+                postings = self.postings.get(term)
+                if postings is not None:
+                    postings.pop(pid, None)
+                    if not postings:
+                        del self.postings[term]
+
+    def search(self, query: str, k: int = 4) -> List[dict]:
+        """Top-k passages by BM25 score"""
+        if not self.passages:
+            return []
+        n = len(self.passages)
+        avg_length = self.total_length / n
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for pid, tf in postings.items():
+                length = self.passages[pid]["length"]
+                denom = tf + self.K1 * (1 - self.B + self.B * length / avg_length)
+                scores[pid] = scores.get(pid, 0.0) + idf * tf * (self.K1 + 1) / denom
+
+        best = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+        return [
+            {
+                "document_id": self.passages[pid]["document_id"],
+                "file_name": self.passages[pid]["file_name"],
+                "text": self.passages[pid]["text"],
+                "score": round(score, 3)
+            }
+            for pid, score in best
+        ]
+
+
+class RetrievalIndex:
+    """
+    Per-user passage indexes over extractedText
+
+    Indexes are built lazily from MongoDB on a user's first query, kept in an
+    LRU of at most RETRIEVAL_MAX_USERS users, and updated incrementally when
+    documents are uploaded or deleted.
+    """
+
+    def __init__(self):
+        self.max_users = settings.RETRIEVAL_MAX_USERS
+        self._indexes: "OrderedDict[str, UserIndex]" = OrderedDict()
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    async def _get_index(self, user_id: str) -> UserIndex:
+        index = self._indexes.get(user_id)
+        if index is not None:
+            self._indexes.move_to_end(user_id)
+            return index
+
+        lock = self._locks.setdefault(user_id, asyncio.Lock())
+        async with lock:
+            index = self._indexes.get(user_id)
+            if index is None:
+                index = await self._build(user_id)
+                self._indexes[user_id] = index
+                while len(self._indexes) > self.max_users:
+                    evicted, _ = self._indexes.popitem(last=False)
+                    self._locks.pop(evicted, None)
+        return index
+
+    async def _build(self, user_id: str) -> UserIndex:
+        db = get_database()
+        index = UserIndex()
+        cursor = db.documents.find(
+            {"userId": ObjectId(user_id), "isDeleted": {"$ne": True}},
+            {"fileName": 1, "extractedText": 1}
+        )
+        async for doc in cursor:
+            if doc.get("extractedText"):
+                index.add_document(str(doc["_id"]), doc.get("fileName", "document"), doc["extractedText"])
+        return index
+
+    async def search(self, user_id: str, query: str, k: int = 4) -> List[dict]:
+        index = await self._get_index(user_id)
+        return index.search(query, k)
+
+    def add_document(self, user_id: str, document_id: str, file_name: str, text: str):
+        """Index a new document if this user's index is loaded (otherwise it is picked up on build)"""
+        index = self._indexes.get(user_id)
+        if index is not None and text:
+            index.add_document(document_id, file_name, text)
+
+    def remove_document(self, user_id: str, document_id: str):
+        index = self._indexes.get(user_id)
+        if index is not None:
+            index.remove_document(document_id)
+
+    def drop_user(self, user_id: str):
+        self._indexes.pop(user_id, None)
+        self._locks.pop(user_id, None)
+
+# Singleton instance
+retrieval_index = RetrievalIndex()
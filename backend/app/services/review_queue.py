@@ -0,0 +1,154 @@
+from bson import ObjectId
+from datetime import datetime, timedelta
+from fastapi import HTTPException, status
+from pymongo import ReturnDocument
+from typing import Dict, List, Optional, Tuple
+from app.config import settings
+from app.database import get_database
+
+# Statuses a verifier can pick up from the queue
+QUEUE_STATUSES = ["pending", "flagged"]
+
+# Analyzed documents waiting in the manual review queue (those with needsReview)
+ANALYZED_STATUSES = ["analyzed", "pending_review"]
+
+# Statuses a manual review may still change (the queue plus the flagged-by-AI queue)
+REVIEWABLE_STATUSES = QUEUE_STATUSES + ANALYZED_STATUSES
+
+# Manual review additionally accepts documents an admin assigned to the reviewer
+# and documents the AI verified that no verifier has reviewed yet
+MANUAL_REVIEW_STATUSES = REVIEWABLE_STATUSES + ["assigned", "verified"]
+
+# Fields returned with a claimed document; enough to show it without another read
+CLAIM_PROJECTION = {
+    "fileName": 1, "fileSize": 1, "fileType": 1, "verificationStatus": 1,
+    "createdAt": 1, "metadata.category": 1, "aiAnalysis": 1, "reviewPriority": 1,
+    "leasedBy": 1, "leaseExpiresAt": 1
+}
+
+
+class ReviewQueue:
+    """
+    Lease-based work queue over pending and flagged documents
+
+    A verifier claims the next document with one find_one_and_update that sets
+    leasedBy/leaseExpiresAt; other verifiers skip it until the lease expires,
+    at which point the next claim takes it over. Reviews are only accepted
+    from the lease holder (or on an unleased document).
+    """
+
+    def __init__(self):
+        self.lease_minutes = settings.REVIEW_LEASE_MINUTES
+
+    @staticmethod
+    def available(now: datetime) -> Dict:
+        """Filter for documents nobody holds a live lease on"""
+        return {"$or": [{"leaseExpiresAt": None}, {"leaseExpiresAt": {"$lte": now}}]}
+
+    @staticmethod
+    def reviewable_by(verifier_id: ObjectId, now: datetime) -> Dict:
+        """Filter for documents a verifier may review: unleased, expired or their own lease"""
+        return {"$or": [
+            {"leaseExpiresAt": None},
+            {"leaseExpiresAt": {"$lte": now}},
+            {"leasedBy": verifier_id}
+        ]}
+
+    @classmethod
+    def manual_review_filter(cls, reviewer_id: ObjectId, is_admin: bool, now: datetime) -> Dict:
+        """Filter for documents a verifier (or admin) may still manually review"""
+        assigned = {"verificationStatus": "assigned"}
+        if not is_admin:
+            assigned["assignedVerifier"] = str(reviewer_id)
+        return {"$or": [
+            {"verificationStatus": {"$in": REVIEWABLE_STATUSES}, **cls.reviewable_by(reviewer_id, now)},
+            assigned,
+            {"verificationStatus": "verified", "review_history.0": {"$exists": False}}
+        ]}
+
+    @staticmethod
+    def release_fields() -> Dict:
+        """$unset clause dropping a lease"""
+        return {"leasedBy": "", "leasedByName": "", "leaseExpiresAt": ""}
+
+    async def claim(
+        self,
+        verifier: Dict,
+        statuses: List[str],
+        sort: List[Tuple[str, int]],
+        query: Optional[Dict] = None
+    ) -> Optional[Dict]:
+        """Atomically lease the first available document in queue order"""
+        db = get_database()
+        now = datetime.utcnow()
+        return await db.documents.find_one_and_update(
+            {
+                **(query or {}),
+                "verificationStatus": {"$in": statuses},
+                "isDeleted": {"$ne": True},
+                **self.available(now)
+            },
+            {"$set": {
+                "leasedBy": ObjectId(verifier["id"]),
+                "leasedByName": verifier["name"],
+                "leaseExpiresAt": now + timedelta(minutes=self.lease_minutes)
+            }},
+            sort=sort,
+            projection=CLAIM_PROJECTION,
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def raise_review_conflict(self, document_id: str, statuses: List[str]):
+        """Explain why a conditional review update matched nothing (404, 400 or 409)"""
+        db = get_database()
+        current = await db.documents.find_one(
+            {"_id": ObjectId(document_id)},
+            {"verificationStatus": 1, "isDeleted": 1, "leasedByName": 1, "review_history": {"$slice": 1}}
+        )
+        if not current or current.get("isDeleted"):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Document not found"
+            )
+        if current.get("verificationStatus") == "assigned" and "assigned" in statuses:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Document is assigned to another verifier"
+            )
+        if current.get("verificationStatus") not in statuses or (
+            current.get("verificationStatus") == "verified" and current.get("review_history")
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Document already reviewed"
+            )
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Document is being reviewed by {current.get('leasedByName', 'another verifier')}"
+        )
+
+    async def renew(self, document_id: str, verifier_id: str) -> Optional[Dict]:
+        """Extend a lease the verifier still holds; None once someone else took it over"""
+        db = get_database()
+        return await db.documents.find_one_and_update(
+            {
+                "_id": ObjectId(document_id),
+                "leasedBy": ObjectId(verifier_id),
+                "verificationStatus": {"$in": REVIEWABLE_STATUSES}
+            },
+            {"$set": {"leaseExpiresAt": datetime.utcnow() + timedelta(minutes=self.lease_minutes)}},
+            projection={"leaseExpiresAt": 1},
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def release(self, document_id: str, verifier_id: str) -> bool:
+        """Give a claimed document back to the queue"""
+        db = get_database()
+        result = await db.documents.update_one(
+            {"_id": ObjectId(document_id), "leasedBy": ObjectId(verifier_id)},
+            {"$unset": self.release_fields()}
+        )
+        return result.modified_count > 0
+
+# Singleton instance
+review_queue = ReviewQueue()
@@ -0,0 +1,110 @@
+from bson import ObjectId
+from collections import Counter
+from datetime import datetime
+from pymongo import UpdateOne
+from typing import Dict, List, Optional, Tuple
+from app.config import settings
+from app.core.cache import TTLCache
+from app.database import get_database
+
+
+class ReviewStore:
+    """
+    Append-only log of verifier reviews in the `reviews` collection
+
+    Documents only keep the latest REVIEW_HISTORY_CACHE_SIZE reviews in their
+    embedded review_history for display; stats and history read the reviews
+    collection. Each review also bumps a per-day, per-verifier, per-decision
+    counter in `review_rollups`, which analytics reads instead of the log.
+    """
+
+    def __init__(self):
+        self.cache_size = settings.REVIEW_HISTORY_CACHE_SIZE
+        # Verifier dashboard stats by reviewer id, dropped when that verifier reviews
+        self.stats_cache = TTLCache(maxsize=1000, ttl=settings.VERIFIER_STATS_CACHE_SECONDS)
+
+    def build_entry(
+        self,
+        reviewer_id: str,
+        reviewer_name: str,
+        decision: str,
+        notes: str,
+        reviewed_at: Optional[datetime] = None
+    ) -> Dict:
+        """Review as embedded in a document's review_history"""
+        return {
+            "reviewer_id": ObjectId(reviewer_id),
+            "reviewer_name": reviewer_name,
+            "decision": decision,
+            "notes": notes,
+            "reviewed_at": reviewed_at or datetime.utcnow()
+        }
+
+    def push_latest(self, entry: Dict) -> Dict:
+        """$push clause adding a review to the bounded review_history cache"""
+        return {"review_history": {"$each": [entry], "$slice": -self.cache_size}}
+
+    async def record(self, document: Dict, entry: Dict):
+        """Append a review of a document (as loaded before the review) to the log"""
+        await self.record_many([(document, entry)])
+
+    async def record_many(self, reviews: List[Tuple[Dict, Dict]]):
+        """Append (document, entry) reviews to the log and rollups in two writes"""
+        if not reviews:
+            return
+        db = get_database()
+        await db.reviews.insert_many([
+            {
+                "document_id": document["_id"],
+                "document_name": document.get("fileName", "document"),
+                "owner_id": document.get("userId"),
+                "previous_status": document.get("verificationStatus"),
+                **entry
+            }
+            for document, entry in reviews
+        ], ordered=False)
+
+        counts = Counter(
+            (self.rollup_day(entry["reviewed_at"]), entry["reviewer_id"], entry["decision"])
+            for _, entry in reviews
+        )
+        await db.review_rollups.bulk_write([
+            UpdateOne(
+                {"day": day, "reviewer_id": reviewer_id, "decision": decision},
+                {"$inc": {"count": count}},
+                upsert=True
+            )
+            for (day, reviewer_id, decision), count in counts.items()
+        ], ordered=False)
+
+        for reviewer_id in {entry["reviewer_id"] for _, entry in reviews}:
+            self.stats_cache.pop(str(reviewer_id))
+
+    async def reviewer_counts(self, reviewer_id: ObjectId, today: datetime, week_start: datetime) -> Dict:
+        """Today, this week, total and approved review counts of a verifier in one aggregation"""
+        db = get_database()
+        today_day = self.rollup_day(today)
+        week_day = self.rollup_day(week_start)
+        result = await db.review_rollups.aggregate([
+            {"$match": {"reviewer_id": reviewer_id}},
+            {
+                "$group": {
+                    "_id": None,
+                    "today": {"$sum": {"$cond": [{"$gte": ["$day", today_day]}, "$count", 0]}},
+                    "week": {"$sum": {"$cond": [{"$gte": ["$day", week_day]}, "$count", 0]}},
+                    "total": {"$sum": "$count"},
+                    "approved": {"$sum": {"$cond": [{"$eq": ["$decision", "approved"]}, "$count", 0]}}
+                }
+            }
+        ]).to_list(1)
+        if not result:
+            return {"today": 0, "week": 0, "total": 0, "approved": 0}
+        return result[0]
+
+    @staticmethod
+    def rollup_day(moment: datetime) -> str:
+        """UTC day bucket of a review, as YYYY-MM-DD"""
+        return moment.strftime("%Y-%m-%d")
+
+# Singleton instance
+review_store = ReviewStore()
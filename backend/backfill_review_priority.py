@@ -0,0 +1,62 @@
+"""
+Compute the review queue fields for documents stored before they existed
+
+The manual review queue only shows documents with needsReview set, and the
+verifier queue's priority mode sorts on queueRank; both are written when a
+document is uploaded or analyzed. Run this once after upgrading so older
+documents appear in the right place. Safe to re-run; pass --all to
+recompute every document (e.g. after changing the priority rules or
+REVIEW_QUEUE_RISK_BOOST_HOURS).
+
+Usage:
+    python backfill_review_priority.py
+    python backfill_review_priority.py --all
+"""
+import argparse
+import os
+
+os.environ.setdefault("SECRET_KEY", "backfill-review-priority")
+os.environ.setdefault("GROQ_API_KEY", "unused")
+
+from pymongo import MongoClient, UpdateOne
+
+from app.core.review_priority import review_fields, queue_rank
+from app.indexes import INDEXES
+
+parser = argparse.ArgumentParser(description="Materialize review queue fields from stored AI analyses")
+parser.add_argument("--uri", default="mongodb://localhost:27017/")
+parser.add_argument("--db", default="docshield")
+parser.add_argument("--all", action="store_true", help="Recompute documents that already have the fields")
+parser.add_argument("--batch-size", type=int, default=1000)
+args = parser.parse_args()
+
+client = MongoClient(args.uri)
+db = client[args.db]
+
+db.documents.create_indexes([
+    m for m in INDEXES["documents"] if m.document["name"] == "status_queue_rank"
+])
+
+query = {} if args.all else {"queueRank": {"$exists": False}}
+
+print("🔄 Computing review queue fields\n")
+
+updated = 0
+flagged = 0
+operations = []
+for doc in db.documents.find(query, {"aiAnalysis": 1, "createdAt": 1}):
+    if doc.get("aiAnalysis"):
+        fields = review_fields(doc["aiAnalysis"], doc["createdAt"])
+        flagged += fields["needsReview"]
+    else:
+        fields = {"queueRank": queue_rank(doc["createdAt"])}
+    operations.append(UpdateOne({"_id": doc["_id"]}, {"$set": fields}))
+    if len(operations) == args.batch_size:
+        updated += db.documents.bulk_write(operations, ordered=False).modified_count
+        operations = []
+if operations:
+    updated += db.documents.bulk_write(operations, ordered=False).modified_count
+
+print(f"📄 Documents updated: {updated}")
+print(f"🚩 Needing review: {flagged}")
+print("\n✅ Review priority backfill complete")
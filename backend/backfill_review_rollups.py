@@ -0,0 +1,80 @@
+"""
+Rebuild the review_rollups counters from the reviews collection
+
+Groups the review log by UTC day, verifier and decision on the server and
+merges the counts into review_rollups, replacing existing counters. Safe to
+re-run; run it after migrate_reviews.py or whenever counters drift. A review
+written while the rebuild runs can be overwritten by the merged count, so
+prefer a quiet period (or pass --since to limit the rebuild).
+
+Usage:
+    python backfill_review_rollups.py
+    python backfill_review_rollups.py --since 2024-01-01
+"""
+import argparse
+import os
+from datetime import datetime
+
+os.environ.setdefault("SECRET_KEY", "backfill-review-rollups")
+os.environ.setdefault("GROQ_API_KEY", "unused")
+
+from pymongo import MongoClient
+
+from app.indexes import INDEXES
+
+parser = argparse.ArgumentParser(description="Rebuild per-day review counters used by verifier analytics")
+parser.add_argument("--uri", default="mongodb://localhost:27017/")
+parser.add_argument("--db", default="docshield")
+parser.add_argument("--since", help="Only rebuild days from this date on (YYYY-MM-DD)")
+args = parser.parse_args()
+
+client = MongoClient(args.uri)
+db = client[args.db]
+
+# $merge matches on the unique (day, reviewer_id, decision) index
+db.review_rollups.create_indexes(INDEXES["review_rollups"])
+
+match = {}
+if args.since:
+    match["reviewed_at"] = {"$gte": datetime.strptime(args.since, "%Y-%m-%d")}
+
+print(f"🔄 Rebuilding review rollups{' since ' + args.since if args.since else ''}\n")
+
+db.reviews.aggregate([
+    {"$match": match},
+    {
+        "$group": {
+            "_id": {
+                "day": {"$dateToString": {"format": "%Y-%m-%d", "date": "$reviewed_at"}},
+                "reviewer_id": "$reviewer_id",
+                "decision": "$decision"
+            },
+            "count": {"$sum": 1}
+        }
+    },
+    {
+        "$project": {
+            "_id": 0,
+            "day": "$_id.day",
+            "reviewer_id": "$_id.reviewer_id",
+            "decision": "$_id.decision",
+            "count": 1
+        }
+    },
+    {
+        "$merge": {
+            "into": "review_rollups",
+            "on": ["day", "reviewer_id", "decision"],
+            "whenMatched": "replace",
+            "whenNotMatched": "insert"
+        }
+    }
+], allowDiskUse=True)
+
+rollup_match = {"day": {"$gte": args.since}} if args.since else {}
+counters = db.review_rollups.count_documents(rollup_match)
+reviews = sum(r["count"] for r in db.review_rollups.find(rollup_match, {"count": 1}))
+
+print(f"📊 Counters: {counters}")
+print(f"📝 Reviews counted: {reviews}")
+print("\n✅ Rollups rebuilt")
@@ -0,0 +1,80 @@
+"""
+Benchmark login password checks with bcrypt inline vs in the password pool
+
+Fires a burst of concurrent logins at one event loop while a heartbeat task
+measures how late the loop wakes up (the delay every other request would see).
+
+Usage:
+    python benchmark_login.py --logins 40 --concurrency 20
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from fastapi import HTTPException
+
+from app.config import settings
+from app.core.security import get_password_hash, verify_password, verify_password_async
+
+
+async def heartbeat(lags, stop, interval=0.01):
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - t0 - interval)
+
+
+async def run(check, hashed: str, logins: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    rejected = 0
+
+    async def login():
+        nonlocal rejected
+        async with semaphore:
+            try:
+                assert await check("correct horse", hashed)
+            except HTTPException as e:
+                if e.status_code != 503:
+                    raise
+                rejected += 1
+
+    lags, stop = [], asyncio.Event()
+    beat = asyncio.create_task(heartbeat(lags, stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    wall = time.perf_counter() - start
+    stop.set()
+    await beat
+    return wall, lags, rejected
+
+
+async def inline_check(password: str, hashed: str) -> bool:
+    return verify_password(password, hashed)
+
+
+def report(label, wall, lags, logins, rejected):
+    lags = lags or [0.0]
+    print(f"{label}")
+    print(f"   Throughput: {(logins - rejected) / wall:.1f} logins/s ({wall:.2f}s wall)")
+    print(f"   Event loop lag: mean {statistics.mean(lags) * 1000:.1f} ms, max {max(lags) * 1000:.1f} ms")
+    if rejected:
+        print(f"   Rejected with 503: {rejected}")
+
+
+async def main(args):
+    hashed = get_password_hash("correct horse")
+    print(f"📊 {args.logins} logins, concurrency {args.concurrency}, "
+          f"{settings.PASSWORD_HASH_WORKERS} workers, max pending {settings.PASSWORD_HASH_MAX_PENDING}\n")
+
+    wall, lags, rejected = await run(inline_check, hashed, args.logins, args.concurrency)
+    report("🐢 bcrypt on the event loop", wall, lags, args.logins, rejected)
+    wall, lags, rejected = await run(verify_password_async, hashed, args.logins, args.concurrency)
+    report("⚡ bcrypt in the password pool", wall, lags, args.logins, rejected)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark login password verification")
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,66 @@
+"""
+Benchmark JWT verification with and without the verified-payload cache
+
+Simulates dashboard polling: a pool of active users, each re-sending the same
+bearer token many times, for a given number of requests.
+
+Usage:
+    python benchmark_token_cache.py --users 200 --requests 100000
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from app.core.security import create_access_token, decode_access_token, _decode_token, token_cache
+
+
+def measure(decode, tokens, total: int, seed: int):
+    rng = random.Random(seed)
+    samples = []
+    start = time.perf_counter()
+    for _ in range(total):
+        token = rng.choice(tokens)
+        t0 = time.perf_counter()
+        payload = decode(token)
+        samples.append(time.perf_counter() - t0)
+        assert payload is not None
+    wall = time.perf_counter() - start
+    return wall, samples
+
+
+def report(label, wall, samples):
+    ordered = sorted(samples)
+    p = lambda pct: ordered[min(int(pct / 100 * len(ordered)), len(ordered) - 1)] * 1e6
+    print(f"{label}")
+    print(f"   Throughput: {len(samples) / wall:,.0f} decodes/s")
+    print(f"   Mean: {statistics.mean(samples) * 1e6:.1f} µs  p50: {p(50):.1f} µs  p99: {p(99):.1f} µs")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark JWT payload cache")
+    parser.add_argument("--users", type=int, default=200, help="Distinct active tokens")
+    parser.add_argument("--requests", type=int, default=50000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    tokens = [
+        create_access_token(
+            {"sub": f"user{i}@docshield.com", "role": "user", "pwd_changed_at": None},
+            expires_delta=timedelta(minutes=30)
+        )
+        for i in range(args.users)
+    ]
+
+    print(f"📊 {args.requests:,} requests across {args.users} tokens\n")
+
+    wall, samples = measure(_decode_token, tokens, args.requests, args.seed)
+    report("🐢 Without cache (full decode + HMAC)", wall, samples)
+    uncached_mean = statistics.mean(samples)
+
+    token_cache.clear()
+    wall, samples = measure(decode_access_token, tokens, args.requests, args.seed)
+    report("⚡ With cache", wall, samples)
+
+    print(f"\n✅ Speed-up: {uncached_mean / statistics.mean(samples):.1f}x, cache entries: {len(token_cache)}")
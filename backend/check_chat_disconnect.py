@@ -0,0 +1,134 @@
+"""
+Check that /api/ai/chat gives back its concurrency slot
+
+Drives the chat endpoint over raw ASGI with a fake Groq stream whose close()
+awaits (as the groq/httpx client does), disconnects after the first chunk,
+and verifies the slot is released and the upstream stream is closed. Also
+checks that a caller at the cap is refused before any session or document
+lookup, and that errors before the stream starts release the slot.
+Needs no network, Groq key or MongoDB.
+
+Usage:
+    python check_chat_disconnect.py
+"""
+import asyncio
+import json
+import os
+from types import SimpleNamespace
+
+os.environ.setdefault("SECRET_KEY", "check-chat-disconnect")
+os.environ.setdefault("GROQ_API_KEY", "unused")
+
+from fastapi import FastAPI
+
+from app.api import ai
+from app.config import settings
+
+
+class SlowStream:
+    """Streams chunks forever, one every 10 ms, and takes a moment to close"""
+
+    def __init__(self):
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        await asyncio.sleep(0.01)
+        return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content="token "))])
+
+    async def close(self):
+        await asyncio.sleep(0.05)
+        self.closed = True
+
+
+streams = []
+
+async def create(**kwargs):
+    stream = SlowStream()
+    streams.append(stream)
+    return stream
+
+ai.groq_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+app = FastAPI()
+app.include_router(ai.router)
+
+
+lookups = []
+
+async def load_session(session_id, owner):
+    lookups.append("session")
+    return None
+
+async def build_document_context(client_key, query):
+    lookups.append("documents")
+    return None
+
+ai.chat_memory.load_session = load_session
+ai.build_document_context = build_document_context
+
+
+async def chat_and_disconnect(**request) -> int:
+    """POST a chat request, hang up after the first streamed chunk; returns the status code"""
+    body = json.dumps({"messages": [{"role": "user", "content": "hi"}], "use_documents": False, **request}).encode()
+    first_chunk = asyncio.Event()
+    sent_request = False
+    status_code = None
+
+    async def receive():
+        nonlocal sent_request
+        if not sent_request:
+            sent_request = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await first_chunk.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status_code
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+        elif message["type"] == "http.response.body" and message.get("body"):
+            first_chunk.set()
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "POST", "scheme": "http", "path": "/api/ai/chat", "raw_path": b"/api/ai/chat",
+        "query_string": b"", "root_path": "", "client": ("127.0.0.1", 50000), "server": ("test", 80),
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+    }
+    await app(scope, receive, send)
+    return status_code
+
+
+async def main():
+    rounds = settings.CHAT_MAX_CONCURRENT_PER_USER + 2
+    print(f"🔌 Disconnecting {rounds} chat streams after the first chunk\n")
+
+    for i in range(rounds):
+        code = await chat_and_disconnect()
+        # Let the shielded upstream close finish
+        await asyncio.sleep(0.1)
+        print(f"   Request {i + 1}: HTTP {code}, open slots: {dict(ai.active_streams)}")
+        assert code == 200, f"request {i + 1} was refused with HTTP {code}"
+
+    assert not ai.active_streams, f"slots leaked: {ai.active_streams}"
+    assert all(stream.closed for stream in streams), "an upstream stream was left open"
+    print("\n✅ Every disconnect released its slot and closed the upstream stream")
+
+    print("\n🚫 Errors before the stream starts\n")
+    code = await chat_and_disconnect(session_id="missing-session")
+    print(f"   Unknown session: HTTP {code}, open slots: {dict(ai.active_streams)}")
+    assert code == 404 and not ai.active_streams, "unknown session leaked a slot"
+
+    lookups.clear()
+    ai.active_streams["ip:127.0.0.1"] = settings.CHAT_MAX_CONCURRENT_PER_USER
+    code = await chat_and_disconnect(session_id="missing-session", use_documents=True)
+    print(f"   At the cap: HTTP {code}, lookups: {lookups}")
+    assert code == 429 and not lookups, "a caller at the cap still paid for lookups"
+    ai.active_streams.clear()
+    print("\n✅ Refused and failed requests cost no lookups and hold no slot")
+
+
+asyncio.run(main())
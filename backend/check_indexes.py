@@ -0,0 +1,84 @@
+"""
+Compare MongoDB indexes with the registry in app/indexes.py
+
+Reports registry indexes that are missing or defined differently on the server,
+server indexes that are not in the registry, and indexes with no recorded use
+since the server started ($indexStats).
+
+Usage:
+    python check_indexes.py                 # report only
+    python check_indexes.py --create        # also create missing registry indexes
+"""
+import argparse
+import os
+
+os.environ.setdefault("SECRET_KEY", "check-indexes")
+os.environ.setdefault("GROQ_API_KEY", "unused")
+
+from pymongo import MongoClient
+
+from app.indexes import INDEXES
+
+
+def registry_spec(model):
+    doc = model.document
+    return doc["name"], list(doc["key"].items())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report missing and unused MongoDB indexes")
+    parser.add_argument("--uri", default="mongodb://localhost:27017/")
+    parser.add_argument("--db", default="docshield")
+    parser.add_argument("--create", action="store_true", help="Create missing registry indexes")
+    args = parser.parse_args()
+
+    client = MongoClient(args.uri)
+    db = client[args.db]
+    problems = 0
+
+    print(f"🔍 Checking indexes in {args.db}...\n")
+
+    for collection, models in INDEXES.items():
+        existing = db[collection].index_information()
+        usage = {
+            stat["name"]: stat["accesses"]["ops"]
+            for stat in db[collection].aggregate([{"$indexStats": {}}])
+        }
+        expected = dict(registry_spec(m) for m in models)
+
+        print(f"📁 {collection}")
+
+        missing = []
+        for name, keys in expected.items():
+            if name not in existing:
+                print(f"   ❌ Missing: {name} {keys}")
+                missing.append(name)
+            elif list(existing[name]["key"]) != keys:
+                print(f"   ⚠️ Differs: {name} is {existing[name]['key']}, registry has {keys}")
+                problems += 1
+            elif usage.get(name, 0) == 0:
+                print(f"   💤 Unused since server start: {name}")
+            else:
+                print(f"   ✅ {name} ({usage[name]} ops)")
+        problems += len(missing)
+
+        for name, info in existing.items():
+            if name == "_id_" or name in expected:
+                continue
+            ops = usage.get(name, 0)
+            print(f"   ❓ Not in registry: {name} {info['key']} ({ops} ops)")
+            problems += 1
+
+        if missing and args.create:
+            db[collection].create_indexes([m for m in models if m.document["name"] in missing])
+            print(f"   🛠️ Created {len(missing)} index(es)")
+            problems -= len(missing)
+
+        print()
+
+    print("="*60)
+    if problems:
+        print(f"⚠️ {problems} index problem(s) found")
+    else:
+        print("✅ Indexes match the registry")
+    raise SystemExit(1 if problems else 0)
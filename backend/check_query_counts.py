@@ -0,0 +1,129 @@
+"""
+Check that listing endpoints issue a constant number of MongoDB commands per page
+
+Seeds a scratch database on a local mongod, calls the verifier and admin
+listing endpoints with a small and a large page size, and counts the
+commands sent to the server. Fails if a bigger page costs more round trips
+(an N+1 lookup crept back in).
+
+Usage:
+    python check_query_counts.py
+"""
+import argparse
+import asyncio
+import os
+import random
+from datetime import datetime, timedelta
+
+os.environ.setdefault("SECRET_KEY", "check-query-counts")
+os.environ.setdefault("GROQ_API_KEY", "unused")
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+
+import app.database as database
+from app.api import admin, verifier
+
+COUNTED = {"find", "aggregate", "count", "getMore", "insert", "update", "delete", "findAndModify"}
+
+
+class CommandCounter(monitoring.CommandListener):
+    def __init__(self):
+        self.commands = []
+
+    def started(self, event):
+        if event.command_name in COUNTED:
+            self.commands.append(event.command_name)
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+async def seed(db, n_users: int, rng: random.Random):
+    now = datetime.utcnow()
+    users = [
+        {"_id": ObjectId(), "name": f"User {i}", "email": f"user{i}@docshield.com", "role": "user",
+         "createdAt": now - timedelta(minutes=i)}
+        for i in range(n_users)
+    ]
+    await db.users.insert_many(users)
+    await db.documents.insert_many([
+        {
+            "userId": user["_id"],
+            "fileName": f"doc_{i}_{j}.pdf",
+            "fileSize": rng.randint(1_000, 1_000_000),
+            "fileType": "application/pdf",
+            "fileHash": f"{rng.getrandbits(64):016x}",
+            "metadata": {"category": "other"},
+            "verificationStatus": rng.choice(["pending", "flagged"]),
+            "isDeleted": False,
+            "createdAt": now - timedelta(minutes=i, seconds=j)
+        }
+        for i, user in enumerate(users)
+        for j in range(2)
+    ])
+
+
+async def main(args):
+    counter = CommandCounter()
+    client = AsyncIOMotorClient(args.uri, event_listeners=[counter])
+    # get_database() always reads client.docshield; point it at the scratch database
+    await client.drop_database(args.db)
+    database.db.client = type("ScratchClient", (), {"docshield": client[args.db], "close": client.close})()
+
+    await seed(client[args.db], args.users, random.Random(1))
+    current_user = {"id": str(ObjectId()), "email": "checker@docshield.com", "name": "Checker", "role": "admin"}
+
+    endpoints = {
+        "verifier.get_all_documents": lambda limit: verifier.get_all_documents(
+            search=None, status_filter=None, date_range=None, show_deleted=False, sort_by="uploadedAt",
+            sort_order="desc", page=1, limit=limit, cursor=None, fields=None, current_user=current_user
+        ),
+        "verifier.get_review_queue": lambda limit: verifier.get_review_queue(
+            status_filter="all", sort_by="oldest", page=1, limit=limit, cursor=None, fields=None,
+            current_user=current_user
+        ),
+        "admin.get_all_users": lambda limit: admin.get_all_users(
+            search=None, role=None, status=None, page=1, limit=limit, cursor=None, admin=current_user
+        ),
+        "admin.get_activity_log": lambda limit: admin.get_activity_log(
+            page=1, limit=limit, cursor=None, admin=current_user
+        ),
+    }
+    limits = {"verifier.get_review_queue": (5, 50)}
+
+    failures = 0
+    print("🔍 MongoDB commands per page\n")
+    try:
+        for name, call in endpoints.items():
+            small, large = limits.get(name, (5, 100))
+            counts = []
+            for limit in (small, large):
+                counter.commands.clear()
+                await call(limit)
+                counts.append(len(counter.commands))
+            if counts[0] == counts[1]:
+                print(f"   ✅ {name}: {counts[0]} commands for {small} and {large} rows")
+            else:
+                print(f"   ❌ {name}: {counts[0]} commands for {small} rows, {counts[1]} for {large}")
+                failures += 1
+    finally:
+        await client.drop_database(args.db)
+        client.close()
+
+    print("\n" + "="*60)
+    print("❌ N+1 queries detected" if failures else "✅ Command counts are constant per page")
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Assert a constant number of DB calls per listing page")
+    parser.add_argument("--uri", default="mongodb://localhost:27017/")
+    parser.add_argument("--db", default="docshield_query_counts")
+    parser.add_argument("--users", type=int, default=150)
+    args = parser.parse_args()
+    raise SystemExit(1 if asyncio.run(main(args)) else 0)
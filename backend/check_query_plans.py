@@ -0,0 +1,437 @@
+"""
+Query-plan regression check
+
+Seeds a scratch database on a local mongod with a synthetic dataset and
+ensures the index registry from app/indexes.py. It then calls the API
+endpoints and background jobs against that database while a pymongo
+CommandListener records every query they send. Each recorded command is
+explained exactly as it was issued. The run fails (exit code 1) when a plan
+uses a COLLSCAN, sorts in memory, or examines far more documents/keys than
+it returns.
+
+Commands listed in KNOWN_ISSUES are reported but do not fail the run; each
+entry says why the plan is accepted.
+
+Usage:
+    python check_query_plans.py
+    python check_query_plans.py --documents 50000 --max-ratio 5 --keep
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import random
+from datetime import datetime, timedelta
+
+os.environ.setdefault("SECRET_KEY", "check-query-plans")
+os.environ.setdefault("GROQ_API_KEY", "unused")
+
+import httpx
+from bson import ObjectId, json_util
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import MongoClient, monitoring
+
+import app.database as database
+from app.core.review_priority import review_fields, queue_rank
+from app.core.security import create_access_token
+from app.indexes import INDEXES
+from app.main import app
+from app.services.admin_stats import admin_stats
+from app.services.analysis_retry_scheduler import analysis_retry_scheduler
+from app.services.document_analyzer import document_analyzer
+from app.services.email_outbox import email_outbox_worker
+
+STATUSES = ["pending"] * 3 + ["analyzed"] * 3 + ["verified"] * 5 + ["flagged", "rejected", "pending_review"]
+CATEGORIES = ["invoice", "contract", "id", "certificate", "other"]
+
+# Commands that may be explained (writes are explained without being applied)
+EXPLAINABLE = {"find", "aggregate", "count", "distinct", "findAndModify", "update", "delete"}
+
+# Session and cluster fields the driver adds, which explain does not accept
+DRIVER_FIELDS = {"lsid", "$db", "$clusterTime", "$readPreference", "txnNumber", "readConcern"}
+
+# (step, command) plans that are accepted, and why
+KNOWN_ISSUES = {
+    ("verifier.documents search", "count"): "unanchored case-insensitive $regex; needs a text index",
+    ("admin.users search", "count"): "unanchored case-insensitive $regex; needs a text index",
+    ("admin.stats", "aggregate"): "full count by design; refreshed in the background by admin_stats",
+    ("cleanup.orphaned files", "find"): "walks every document by design; runs daily",
+}
+
+
+def seed(db, n_users: int, n_documents: int, rng: random.Random):
+    now = datetime.utcnow()
+    roles = ["admin"] * 2 + ["verifier"] * 10
+    users = [
+        {
+            "_id": ObjectId(),
+            "name": f"User {i}",
+            "email": f"user{i}@docshield.com",
+            "role": roles[i] if i < len(roles) else "user",
+            "banned": i >= len(roles) and rng.random() < 0.02,
+            "createdAt": now - timedelta(days=rng.randint(0, 365), seconds=rng.randint(0, 86400))
+        }
+        for i in range(n_users)
+    ]
+    db.users.insert_many(users)
+    verifiers = [u for u in users if u["role"] in ("verifier", "admin")]
+
+    batch, reviews = [], []
+    for i in range(n_documents):
+        created = now - timedelta(days=rng.randint(0, 365), seconds=rng.randint(0, 86400))
+        status = rng.choice(STATUSES)
+        deleted = rng.random() < 0.05
+        doc = {
+            "_id": ObjectId(),
+            "userId": rng.choice(users)["_id"],
+            "fileName": f"{rng.choice(CATEGORIES)}_{i}.pdf",
+            "fileSize": rng.randint(1_000, 10_000_000),
+            "fileType": "application/pdf",
+            "fileHash": f"{rng.getrandbits(128):032x}",
+            "metadata": {"category": rng.choice(CATEGORIES), "uploadedAt": created, "tags": []},
+            "verificationStatus": status,
+            "isDeleted": deleted,
+            "createdAt": created,
+            "updatedAt": created
+        }
+        if deleted:
+            doc["deletedAt"] = created + timedelta(days=1)
+        if status != "pending":
+            score = rng.randint(20, 100)
+            doc["aiAnalysis"] = {
+                "authenticityScore": score,
+                "riskLevel": "low" if score >= 70 else "high",
+                "flags": [] if score >= 70 else ["Low authenticity"],
+                "provisional": rng.random() < 0.01
+            }
+            doc.update(review_fields(doc["aiAnalysis"], created))
+        else:
+            doc["queueRank"] = queue_rank(created)
+        if status in ("verified", "rejected", "flagged"):
+            reviewer = rng.choice(verifiers)
+            review = {
+                "reviewer_id": reviewer["_id"],
+                "reviewer_name": reviewer["name"],
+                "decision": {"verified": "approved", "rejected": "rejected", "flagged": "flagged"}[status],
+                "notes": "",
+                "reviewed_at": created + timedelta(hours=rng.randint(1, 72))
+            }
+            doc["review_history"] = [review]
+            reviews.append({
+                "document_id": doc["_id"],
+                "document_name": doc["fileName"],
+                "owner_id": doc["userId"],
+                "previous_status": "analyzed",
+                **review
+            })
+        batch.append(doc)
+        if len(batch) == 1000:
+            db.documents.insert_many(batch)
+            batch = []
+    if batch:
+        db.documents.insert_many(batch)
+    db.reviews.insert_many(reviews)
+    rollups = {}
+    for review in reviews:
+        key = (review["reviewed_at"].strftime("%Y-%m-%d"), review["reviewer_id"], review["decision"])
+        rollups[key] = rollups.get(key, 0) + 1
+    db.review_rollups.insert_many([
+        {"day": day, "reviewer_id": reviewer_id, "decision": decision, "count": count}
+        for (day, reviewer_id, decision), count in rollups.items()
+    ])
+
+    docs = list(db.documents.aggregate([{"$sample": {"size": 200}}]))
+    db.shares.insert_many([
+        {
+            "share_id": f"share{i}",
+            "document_id": d["_id"],
+            "user_id": d["userId"],
+            "is_revoked": False,
+            "allow_download": True,
+            "view_count": 0,
+            "created_at": d["createdAt"]
+        }
+        for i, d in enumerate(docs)
+    ])
+    db.certificates.insert_many([
+        {"certificateId": f"CERT-{i:06d}", "documentId": d["_id"], "userId": d["userId"]}
+        for i, d in enumerate(docs[:100])
+    ])
+    db.chat_sessions.insert_many([
+        {"session_id": f"session{i:04d}", "owner": f"user:user{i}@docshield.com", "turns": [], "last_used_at": now}
+        for i in range(100)
+    ])
+    db.email_outbox.insert_many([
+        {
+            "to": f"user{i}@docshield.com", "subject": "Document Verified", "html": "",
+            "status": "sent" if i % 20 else "pending", "attempts": 1,
+            "next_attempt_at": now - timedelta(minutes=i), "created_at": now - timedelta(minutes=i)
+        }
+        for i in range(2000)
+    ])
+
+    for collection, models in INDEXES.items():
+        db[collection].create_indexes(models)
+
+    return users, verifiers, docs
+
+
+class CommandRecorder(monitoring.CommandListener):
+    """Collects the explainable commands sent while a step runs"""
+
+    def __init__(self):
+        self.step = None
+        self.commands = []
+
+    def started(self, event):
+        if self.step and event.command_name in EXPLAINABLE:
+            command = {k: v for k, v in event.command.items() if k not in DRIVER_FIELDS}
+            self.commands.append((self.step, event.command_name, command))
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+def token(user: dict) -> dict:
+    access_token = create_access_token({"sub": user["email"], "role": user["role"], "pwd_changed_at": None})
+    return {"Authorization": f"Bearer {access_token}"}
+
+
+def api_steps(users, verifiers, docs):
+    """(step, user or None, method, path, params) for the endpoints to call"""
+    admin = users[0]
+    verifier = next(u for u in verifiers if u["role"] == "verifier")
+    owned = next(d for d in docs if not next(u for u in users if u["_id"] == d["userId"])["banned"])
+    owner = next(u for u in users if u["_id"] == owned["userId"])
+
+    return [
+        # owner
+        ("auth.me", owner, "GET", "/api/auth/me", None),
+        ("documents.list", owner, "GET", "/api/documents/", None),
+        ("documents.list by status", owner, "GET", "/api/documents/", {"status_filter": "verified"}),
+        ("documents.get", owner, "GET", f"/api/documents/{owned['_id']}", None),
+        ("certificates.for document", owner, "GET", f"/api/certificates/document/{owned['_id']}", None),
+        ("notifications.preferences", owner, "GET", "/api/notifications/preferences", None),
+        ("shares.list", owner, "GET", "/api/shares", None),
+
+        # public
+        ("public.share", None, "GET", "/api/public/share/share7", None),
+        ("certificates.verify", None, "GET", "/api/certificates/verify/CERT-000007", None),
+
+        # verifier
+        ("verifier.documents", verifier, "GET", "/api/verifier/documents", None),
+        ("verifier.documents by name", verifier, "GET", "/api/verifier/documents",
+         {"sort_by": "fileName", "sort_order": "asc"}),
+        ("verifier.documents by size", verifier, "GET", "/api/verifier/documents", {"sort_by": "fileSize"}),
+        ("verifier.documents by status", verifier, "GET", "/api/verifier/documents", {"status_filter": "flagged"}),
+        ("verifier.documents this week", verifier, "GET", "/api/verifier/documents", {"date_range": "week"}),
+        ("verifier.documents search", verifier, "GET", "/api/verifier/documents", {"search": "invoice"}),
+        ("verifier.documents with deleted", verifier, "GET", "/api/verifier/documents", {"show_deleted": "true"}),
+        ("verifier.queue", verifier, "GET", "/api/verifier/queue", None),
+        ("verifier.queue priority", verifier, "GET", "/api/verifier/queue", {"sort_by": "priority"}),
+        ("verifier.queue claim", verifier, "POST", "/api/verifier/queue/claim", None),
+        ("verifier.queue claim by priority", verifier, "POST", "/api/verifier/queue/claim", {"sort_by": "priority"}),
+        ("verifier.stats", verifier, "GET", "/api/verifier/stats", None),
+        ("verifier.history", verifier, "GET", "/api/verifier/history", None),
+        ("verifier.history by decision", verifier, "GET", "/api/verifier/history", {"decision": "approved"}),
+        ("verifier.document reviews", verifier, "GET", f"/api/verifier/documents/{docs[0]['_id']}/reviews", None),
+        ("verifier.analytics", verifier, "GET", "/api/verifier/analytics", None),
+        ("manual_review.flagged", verifier, "GET", "/api/verification/queue/flagged", None),
+        ("manual_review.claim", verifier, "POST", "/api/verification/queue/flagged/claim", None),
+
+        # admin
+        ("admin.users", admin, "GET", "/api/admin/users", None),
+        ("admin.users by role", admin, "GET", "/api/admin/users", {"role": "verifier"}),
+        ("admin.users search", admin, "GET", "/api/admin/users", {"search": "user 1"}),
+        ("admin.activity", admin, "GET", "/api/admin/activity", None),
+    ]
+
+
+async def no_ai(**kwargs):
+    """Stand-in analysis so the retry job runs its queries without calling Groq"""
+    return {"success": False, "provisional": True}
+
+
+def job_steps(users):
+    """(step, coroutine function) for background work outside the routers.
+
+    The file cleanup jobs are left out: they delete files under ./uploads that
+    the scratch database does not know about.
+    """
+    from app.api.ai import build_document_context
+    from app.services.chat_memory import chat_memory
+
+    document_analyzer.analyze_document = no_ai
+    owner = f"user:{users[-1]['email']}"
+    return [
+        ("admin.stats", admin_stats.compute),
+        ("email_outbox.claim", email_outbox_worker.claim_batch),
+        ("analysis_retry.provisional", analysis_retry_scheduler.retry_provisional_analyses),
+        ("chat.session", lambda: chat_memory.load_session("session0042", owner)),
+        ("chat.retrieval", lambda: build_document_context(owner, "invoice total amount")),
+    ]
+
+
+async def record(uri: str, db_name: str, users, verifiers, docs):
+    """Run every step against the scratch database; returns (recorded commands, failed steps)"""
+    recorder = CommandRecorder()
+    client = AsyncIOMotorClient(uri, event_listeners=[recorder])
+    # get_database() always reads client.docshield; point it at the scratch database
+    database.db.client = type("ScratchClient", (), {"docshield": client[db_name], "close": client.close})()
+
+    failed = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://check") as http:
+        for step, user, method, path, params in api_steps(users, verifiers, docs):
+            recorder.step = step
+            with contextlib.redirect_stdout(io.StringIO()):
+                response = await http.request(method, path, params=params, headers=token(user) if user else None)
+            if response.status_code >= 400:
+                failed.append(f"{step}: HTTP {response.status_code} {response.text[:200]}")
+
+    for step, run in job_steps(users):
+        recorder.step = step
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                await run()
+        except Exception as e:
+            failed.append(f"{step}: {e}")
+
+    recorder.step = None
+    client.close()
+    return recorder.commands, failed
+
+
+def kind_of(name: str, command: dict) -> str:
+    """find, count (count_documents runs as $match + $group), aggregate, ..."""
+    if name == "aggregate":
+        stages = [next(iter(stage)) for stage in command.get("pipeline", [])]
+        if stages in (["$match", "$group"], ["$match", "$skip", "$limit", "$group"], ["$match", "$limit", "$group"]) \
+                and command["pipeline"][-1]["$group"].get("_id") == 1:
+            return "count"
+    return name
+
+
+def shape(value):
+    """A command with its literal values blanked, to explain each query shape once per step"""
+    if isinstance(value, dict):
+        return "{" + ",".join(f"{k}:{shape(v)}" for k, v in value.items()) + "}"
+    if isinstance(value, list):
+        return "[" + ",".join(shape(v) for v in value) + "]"
+    return type(value).__name__
+
+
+def explain(db, command: dict) -> dict:
+    return db.command("explain", command, verbosity="executionStats")
+
+
+def plan_stages(node, in_plan: bool = False) -> list:
+    """Stage names of every winning plan in an explain document"""
+    stages = []
+    if isinstance(node, dict):
+        if in_plan and "stage" in node:
+            stages.append(node["stage"])
+        for key, value in node.items():
+            if key in ("rejectedPlans", "slotBasedPlan"):
+                continue
+            stages += plan_stages(value, in_plan or key == "winningPlan")
+    elif isinstance(node, list):
+        for item in node:
+            stages += plan_stages(item, in_plan)
+    return stages
+
+
+def execution_stats(node):
+    if isinstance(node, dict):
+        if "executionStats" in node:
+            return node["executionStats"]
+        for value in node.values():
+            found = execution_stats(value)
+            if found:
+                return found
+    elif isinstance(node, list):
+        for item in node:
+            found = execution_stats(item)
+            if found:
+                return found
+    return None
+
+
+def check(result: dict, kind: str, max_ratio: float, min_examined: int) -> list:
+    problems = []
+    stages = plan_stages(result)
+    if "COLLSCAN" in stages:
+        problems.append("COLLSCAN")
+    if kind in ("find", "findAndModify") and "SORT" in stages:
+        problems.append("in-memory SORT")
+
+    stats = execution_stats(result) or {}
+    returned = stats.get("nReturned", 0)
+    examined = max(stats.get("totalDocsExamined", 0), stats.get("totalKeysExamined", 0))
+    # Counts return a single row by design, so the ratio only applies to finds
+    if kind == "find" and examined > min_examined and examined > max_ratio * max(returned, 1):
+        problems.append(f"examined {examined} for {returned} returned")
+    return problems
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fail on query plans that scan or sort in memory")
+    parser.add_argument("--uri", default="mongodb://localhost:27017/")
+    parser.add_argument("--db", default="docshield_query_plans")
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--documents", type=int, default=20000)
+    parser.add_argument("--max-ratio", type=float, default=10.0, help="Max examined/returned ratio")
+    parser.add_argument("--min-examined", type=int, default=100, help="Ignore the ratio below this many examined")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch database afterwards")
+    args = parser.parse_args()
+
+    client = MongoClient(args.uri)
+    client.drop_database(args.db)
+    db = client[args.db]
+
+    print(f"🌱 Seeding {args.documents:,} documents for {args.users} users in {args.db}...")
+    users, verifiers, docs = seed(db, args.users, args.documents, random.Random(args.seed))
+
+    failures = 0
+    try:
+        print("\n▶️ Calling endpoints and background jobs")
+        commands, failed_steps = asyncio.run(record(args.uri, args.db, users, verifiers, docs))
+        for failure in failed_steps:
+            print(f"   ❌ {failure}")
+        failures += len(failed_steps)
+
+        print(f"\n🔍 Explaining {len(commands)} recorded commands\n")
+        seen = set()
+        for step, name, command in commands:
+            collection = command[name]
+            key = (step, name, shape(command))
+            if key in seen:
+                continue
+            seen.add(key)
+
+            kind = kind_of(name, command)
+            label = f"{step}: {kind} {collection}"
+            problems = check(explain(db, command), kind, args.max_ratio, args.min_examined)
+            if not problems:
+                print(f"   ✅ {label}")
+            elif (step, kind) in KNOWN_ISSUES:
+                print(f"   ⚠️ {label}: {', '.join(problems)} (known: {KNOWN_ISSUES[(step, kind)]})")
+            else:
+                print(f"   ❌ {label}: {', '.join(problems)}")
+                print(f"      {json_util.dumps(command)[:300]}")
+                failures += 1
+    finally:
+        if not args.keep:
+            client.drop_database(args.db)
+
+    print("\n" + "="*60)
+    if failures:
+        print(f"❌ {failures} query plan regression(s)")
+    else:
+        print("✅ No query plan regressions")
+    raise SystemExit(1 if failures else 0)
@@ -0,0 +1,166 @@
+"""
+Local Groq/OpenAI-compatible stub server for offline load testing
+
+Point the backend at it with GROQ_BASE_URL=http://localhost:8090 and any GROQ_API_KEY.
+
+Usage:
+    python groq_stub_server.py --port 8090 --latency-ms 400 --jitter-ms 150 \
+        --error-rate 0.05 --chunk-delay-ms 25 --seed 42
+"""
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+
+app = FastAPI(title="Groq Stub")
+
+config = {
+    "latency_ms": 300.0,      # Time before the first byte / full response
+    "jitter_ms": 100.0,       # Uniform +/- jitter applied to latency
+    "error_rate": 0.0,        # Fraction of requests answered with an error
+    "error_status": 503,      # Status code used for injected errors
+    "timeout_rate": 0.0,      # Fraction of requests that hang for hang_seconds
+    "hang_seconds": 60.0,
+    "chunk_delay_ms": 20.0,   # Delay between streamed chunks
+    "chunk_words": 3,         # Words per streamed chunk
+}
+rng = random.Random(0)
+
+CHAT_REPLY = (
+    "DocShield verifies documents with quantum-resistant signatures and AI-powered "
+    "authenticity analysis. Upload a PDF or image, request verification and a verifier "
+    "will review anything the analysis flags. Verified documents can be shared and "
+    "receive a certificate with a QR code for instant checks."
+)
+
+
+def analysis_reply() -> str:
+    score = rng.randint(40, 98)
+    risk = "low" if score >= 70 else "medium" if score >= 50 else "high"
+    flags = [] if score >= 80 else ["Inconsistent formatting"]
+    return json.dumps({
+        "authenticityScore": score,
+        "riskLevel": risk,
+        "flags": flags,
+        "summary": "Stub analysis generated by the local Groq stand-in.",
+        "confidence": round(rng.uniform(0.6, 0.95), 2)
+    })
+
+
+async def simulate_latency():
+    latency = config["latency_ms"] + rng.uniform(-config["jitter_ms"], config["jitter_ms"])
+    await asyncio.sleep(max(latency, 0) / 1000)
+
+
+def injected_error():
+    if rng.random() < config["error_rate"]:
+        status = config["error_status"]
+        return JSONResponse(
+            status_code=status,
+            headers={"retry-after": "1"} if status == 429 else None,
+            content={"error": {"message": "Injected stub error", "type": "server_error", "code": status}}
+        )
+    return None
+
+
+@app.post("/openai/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    model = body.get("model", "stub-model")
+    messages = body.get("messages", [])
+
+    if rng.random() < config["timeout_rate"]:
+        await asyncio.sleep(config["hang_seconds"])
+
+    error = injected_error()
+    if error:
+        await simulate_latency()
+        return error
+
+    # The analyzer's system prompt asks for JSON, everything else is chat
+    wants_json = any("JSON" in m.get("content", "") for m in messages if m.get("role") == "system")
+    content = analysis_reply() if wants_json else CHAT_REPLY
+    completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+    created = int(time.time())
+
+    if not body.get("stream"):
+        await simulate_latency()
+        prompt_tokens = sum(len(m.get("content", "").split()) for m in messages)
+        completion_tokens = len(content.split())
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        }
+
+    async def stream():
+        await simulate_latency()
+        words = content.split(" ")
+        size = config["chunk_words"]
+        for i in range(0, len(words), size):
+            piece = " ".join(words[i:i + size]) + (" " if i + size < len(words) else "")
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]
+            }
+            yield f"data: {json.dumps(chunk)}\n\n"
+            await asyncio.sleep(config["chunk_delay_ms"] / 1000)
+        final = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]
+        }
+        yield f"data: {json.dumps(final)}\n\n"
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(stream(), media_type="text/event-stream")
+
+
+@app.get("/openai/v1/models")
+async def list_models():
+    return {"object": "list", "data": [{"id": "llama-3.3-70b-versatile", "object": "model"}]}
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Groq-compatible stub server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency-ms", type=float, default=config["latency_ms"])
+    parser.add_argument("--jitter-ms", type=float, default=config["jitter_ms"])
+    parser.add_argument("--error-rate", type=float, default=config["error_rate"])
+    parser.add_argument("--error-status", type=int, default=config["error_status"])
+    parser.add_argument("--timeout-rate", type=float, default=config["timeout_rate"])
+    parser.add_argument("--hang-seconds", type=float, default=config["hang_seconds"])
+    parser.add_argument("--chunk-delay-ms", type=float, default=config["chunk_delay_ms"])
+    parser.add_argument("--chunk-words", type=int, default=config["chunk_words"])
+    parser.add_argument("--seed", type=int, default=0, help="Seed for deterministic latency/errors")
+    args = parser.parse_args()
+
+    for key in config:
+        config[key] = getattr(args, key)
+    rng.seed(args.seed)
+
+    print(f"🧪 Groq stub listening on http://{args.host}:{args.port} ({config})")
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
@@ -0,0 +1,91 @@
+"""
+Move embedded review_history entries into the reviews collection
+
+Copies every review embedded in a document into `reviews` (idempotent: a
+review is matched on document, reviewer and time, so re-running is safe),
+then trims each document's review_history to the latest
+REVIEW_HISTORY_CACHE_SIZE entries.
+
+Usage:
+    python migrate_reviews.py --dry-run
+    python migrate_reviews.py
+"""
+import argparse
+import os
+
+os.environ.setdefault("SECRET_KEY", "migrate-reviews")
+os.environ.setdefault("GROQ_API_KEY", "unused")
+
+from pymongo import MongoClient, UpdateOne
+
+from app.config import settings
+from app.indexes import INDEXES
+
+parser = argparse.ArgumentParser(description="Migrate embedded review_history into the reviews collection")
+parser.add_argument("--uri", default="mongodb://localhost:27017/")
+parser.add_argument("--db", default="docshield")
+parser.add_argument("--dry-run", action="store_true", help="Only count what would be migrated")
+args = parser.parse_args()
+
+client = MongoClient(args.uri)
+db = client[args.db]
+keep = settings.REVIEW_HISTORY_CACHE_SIZE
+
+print(f"🔄 Migrating review_history into reviews (keeping latest {keep} on each document)\n")
+
+if not args.dry_run:
+    db.reviews.create_indexes(INDEXES["reviews"])
+
+documents = db.documents.find(
+    {"review_history.0": {"$exists": True}},
+    {"fileName": 1, "userId": 1, "review_history": 1}
+)
+
+migrated_docs = 0
+migrated_reviews = 0
+trimmed = 0
+
+for doc in documents:
+    history = sorted(
+        [r for r in doc["review_history"] if r.get("reviewer_id") and r.get("reviewed_at")],
+        key=lambda r: r["reviewed_at"]
+    )
+    operations = [
+        UpdateOne(
+            {"document_id": doc["_id"], "reviewer_id": review["reviewer_id"], "reviewed_at": review["reviewed_at"]},
+            {"$setOnInsert": {
+                "document_id": doc["_id"],
+                "document_name": doc.get("fileName", "document"),
+                "owner_id": doc.get("userId"),
+                "reviewer_id": review["reviewer_id"],
+                "reviewer_name": review.get("reviewer_name", "Unknown"),
+                "decision": review.get("decision", ""),
+                "notes": review.get("notes", ""),
+                "reviewed_at": review["reviewed_at"]
+            }},
+            upsert=True
+        )
+        for review in history
+    ]
+
+    migrated_docs += 1
+    migrated_reviews += len(operations)
+    if len(doc["review_history"]) > keep:
+        trimmed += 1
+
+    if args.dry_run or not operations:
+        continue
+
+    db.reviews.bulk_write(operations, ordered=False)
+    if len(doc["review_history"]) > keep:
+        db.documents.update_one(
+            {"_id": doc["_id"]},
+            {"$push": {"review_history": {"$each": [], "$sort": {"reviewed_at": 1}, "$slice": -keep}}}
+        )
+
+print(f"📄 Documents with reviews: {migrated_docs}")
+print(f"📝 Reviews {'to copy' if args.dry_run else 'copied (or already present)'}: {migrated_reviews}")
+print(f"✂️ Documents {'to trim' if args.dry_run else 'trimmed'}: {trimmed}")
+print(f"\n{'🔍 Dry run - nothing written' if args.dry_run else '✅ Migration complete'}")
+if not args.dry_run:
+    print("👉 Run backfill_review_rollups.py to rebuild analytics counters")
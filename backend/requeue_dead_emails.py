@@ -0,0 +1,50 @@
+"""
+Inspect and retry dead-lettered emails in the outbox
+
+Messages the outbox worker gave up on (EMAIL_MAX_ATTEMPTS failed sends) stay
+in email_outbox with status "dead". Once the mail relay is fixed, requeue
+them so the worker sends them on its next poll.
+
+Usage:
+    python requeue_dead_emails.py            # list dead letters
+    python requeue_dead_emails.py --requeue
+"""
+import argparse
+import os
+from datetime import datetime
+
+os.environ.setdefault("SECRET_KEY", "requeue-dead-emails")
+os.environ.setdefault("GROQ_API_KEY", "unused")
+
+from pymongo import MongoClient
+
+parser = argparse.ArgumentParser(description="List or requeue dead-lettered outbox emails")
+parser.add_argument("--uri", default="mongodb://localhost:27017/")
+parser.add_argument("--db", default="docshield")
+parser.add_argument("--requeue", action="store_true", help="Reset dead letters so they are sent again")
+args = parser.parse_args()
+
+client = MongoClient(args.uri)
+db = client[args.db]
+
+dead = list(db.email_outbox.find(
+    {"status": "dead"},
+    {"to": 1, "subject": 1, "attempts": 1, "failed_at": 1, "last_error": 1}
+).sort("failed_at", -1))
+
+print(f"💀 Dead-lettered emails: {len(dead)}\n")
+for message in dead[:50]:
+    print(f"   {message.get('failed_at')} {message['to']}: {message['subject']}")
+    print(f"      {message.get('last_error', '')}")
+if len(dead) > 50:
+    print(f"   ... and {len(dead) - 50} more")
+
+if args.requeue and dead:
+    result = db.email_outbox.update_many(
+        {"status": "dead"},
+        {
+            "$set": {"status": "pending", "attempts": 0, "next_attempt_at": datetime.utcnow()},
+            "$unset": {"failed_at": ""}
+        }
+    )
+    print(f"\n✅ Requeued {result.modified_count} emails")
@@ -488,11 +488,24 @@ export const apiClient = {
         return response.json();
     },
 
-    async getPublicShare(shareId: string, password?: string) {
-        const params = new URLSearchParams();
-        if (password) params.append('password', password);
-        const url = `${API_BASE_URL}/api/public/share/${shareId}${password ? `?${params}` : ''}`;
-        const response = await fetch(url);
+    async unlockShare(shareId: string, password: string) {
+        const response = await fetch(`${API_BASE_URL}/api/public/share/${shareId}/unlock`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ password })
+        });
+        if (!response.ok) {
+            const error = await response.json();
+            throw new Error(error.detail || 'Failed to unlock share');
+        }
+        return response.json();
+    },
+
+    async getPublicShare(shareId: string, accessToken?: string) {
+        const url = `${API_BASE_URL}/api/public/share/${shareId}`;
+        const response = await fetch(url, {
+            headers: accessToken ? { 'X-Share-Token': accessToken } : {}
+        });
         if (!response.ok) {
             const error = await response.json();
             throw new Error(error.detail || 'Failed to access share');
@@ -582,6 +595,54 @@ export const apiClient = {
         return response.json();
     },
 
+    async bulkReview(reviews: { document_id: string; decision: 'approved' | 'rejected' | 'flagged'; notes?: string }[]) {
+        const token = this.getToken();
+        const response = await fetch(`${API_BASE_URL}/api/verifier/bulk-review`, {
+            method: 'POST',
+            headers: {
+                'Authorization': `Bearer ${token}`,
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify({ reviews })
+        });
+        if (!response.ok) throw new Error('Failed to review documents');
+        return response.json();
+    },
+
+    async claimNextDocument(filters: { status?: string; sortBy?: string } = {}) {
+        const token = this.getToken();
+        const params = new URLSearchParams();
+        if (filters.status) params.append('status_filter', filters.status);
+        if (filters.sortBy) params.append('sort_by', filters.sortBy);
+
+        const response = await fetch(`${API_BASE_URL}/api/verifier/queue/claim?${params}`, {
+            method: 'POST',
+            headers: { 'Authorization': `Bearer ${token}` }
+        });
+        if (!response.ok) throw new Error('Failed to claim document');
+        return response.json();
+    },
+
+    async renewDocumentLease(documentId: string) {
+        const token = this.getToken();
+        const response = await fetch(`${API_BASE_URL}/api/verifier/queue/${documentId}/renew`, {
+            method: 'POST',
+            headers: { 'Authorization': `Bearer ${token}` }
+        });
+        if (!response.ok) throw new Error('Lease lost');
+        return response.json();
+    },
+
+    async releaseDocumentLease(documentId: string) {
+        const token = this.getToken();
+        const response = await fetch(`${API_BASE_URL}/api/verifier/queue/${documentId}/lease`, {
+            method: 'DELETE',
+            headers: { 'Authorization': `Bearer ${token}` }
+        });
+        if (!response.ok) throw new Error('Failed to release document');
+        return response.json();
+    },
+
     async getReviewHistory(filters: {
         decision?: string;
         page?: number;